@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Auxiliary layers (GSW occurrence, ESA WorldCover, DEM slope) reprojected onto the grid of a product.
+"""
+
+
+import threading
+from collections import OrderedDict
+from osgeo import gdal
+from Common.ImageTools import gdal_warp
+from Common.RasterCache import RasterCache
+
+
+def dem_slope(topo_names, epsg, extent_str, res=[10, 10]):
+    """
+    Compute the slope (in degrees) of a DEM mosaic on a given grid, without writing any file to disk.
+
+    :param topo_names: DEM filenames from which SLP calculation will be made
+    :param epsg: epsg tile number
+    :param extent_str: tile extent as 'xmin ymin xmax ymax'
+    :param res: output resolution (x, y)
+    :return: The slope as :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper`
+    """
+    # In-memory DEM mosaic, reprojected on the tile at its native resolution
+    vrt = gdal.BuildVRT("", list(topo_names))
+    dem = gdal.Warp("", vrt, format="MEM", srcSRS="EPSG:4326", dstSRS="EPSG:%s" % epsg,
+                    outputBounds=[float(i) for i in extent_str.split()])
+    vrt = None
+
+    # Slope formation
+    slope = gdal.DEMProcessing("", dem, "slope", format="MEM")
+    dem = None
+
+    # Slope formatting (crop and resampling)
+    return gdal_warp(slope,
+                     t_srs="EPSG:%s" % epsg,
+                     tr="%s %s" % (res[0], res[1]),
+                     te=extent_str,
+                     r="bilinear",
+                     ot="Float32")
+
+
+class AuxiliaryLayers(object):
+    """
+    Service returning auxiliary layers on a target grid (EPSG, extent, resolution).
+
+    Each layer is mosaicked from its source files and reprojected in a single warp.
+    Results are kept in a size-bounded memory cache and, optionally, in a persistent
+    :class:`Common.RasterCache.RasterCache` on disk. The returned arrays are read-only.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=10 * 1024 ** 3, max_memory_bytes=2 * 1024 ** 3):
+        """
+        Create an auxiliary layer service
+
+        :param cache_dir: Optional directory of the persistent cache. No disk cache is used if None.
+        :param max_bytes: The maximum size of the disk cache in bytes. Default is 10GB.
+        :param max_memory_bytes: The maximum size of the in-memory cache in bytes. Default is 2GB.
+        """
+        self.disk = RasterCache(cache_dir, max_bytes=max_bytes) if cache_dir else None
+        self.max_memory_bytes = max_memory_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def te(extent):
+        """
+        Format an extent for gdalwarp
+
+        :param extent: The extent as (xmin, ymin, xmax, ymax) or as 'xmin ymin xmax ymax' string
+        :return: The extent as string
+        """
+        if isinstance(extent, str):
+            return extent
+        return "{} {} {} {}".format(*extent)
+
+    def _from_memory(self, key):
+        with self._lock:
+            ds = self._memory.get(key)
+            if ds is not None:
+                self._memory.move_to_end(key)
+            return ds
+
+    def _to_memory(self, key, ds):
+        ds.array.flags.writeable = False
+        with self._lock:
+            self._memory[key] = ds
+            # The bytes actually held by each layer: its array, and its dataset if in memory
+            total = sum(d.nbytes for d in self._memory.values())
+            while total > self.max_memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                total -= evicted.nbytes
+
+    def _cached(self, key, compute):
+        """
+        Get a layer from the memory or disk cache, or compute and cache it.
+
+        :param key: The cache key
+        :param compute: Function computing the layer if not cached
+        :return: The layer as :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper`
+        """
+        ds = self._from_memory(key)
+        if ds is not None:
+            return ds
+        if self.disk is not None:
+            ds = self.disk.get(key)
+        if ds is None:
+            ds = compute()
+            if self.disk is not None:
+                self.disk.put(key, ds)
+        self._to_memory(key, ds)
+        return ds
+
+    def get(self, name, files, epsg, extent, res, r="nearest", ot=None):
+        """
+        Get a layer mosaicked from geographic (EPSG:4326) source files and reprojected on the target grid.
+
+        :param name: The name of the layer, e.g. 'gsw' or 'worldcover'
+        :param files: The source filenames
+        :param epsg: The target EPSG code
+        :param extent: The target extent as (xmin, ymin, xmax, ymax)
+        :param res: The target resolution (x, y)
+        :param r: The resampling method. Default is nearest.
+        :param ot: Optional output type, e.g. 'Float32'
+        :return: The layer as :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper`
+        """
+        te = self.te(extent)
+        key = RasterCache.make_key(files, layer=name, epsg=epsg, extent=te, res=list(res), r=r, ot=ot)
+
+        def compute():
+            options = {"s_srs": "EPSG:4326",
+                       "t_srs": "EPSG:%s" % epsg,
+                       "tr": "%s %s" % (res[0], res[1]),
+                       "te": te,
+                       "r": r}
+            if ot:
+                options["ot"] = ot
+            vrt = gdal.BuildVRT("", list(files))
+            return gdal_warp(vrt, **options)
+        return self._cached(key, compute)
+
+    def slope(self, files, epsg, extent, res):
+        """
+        Get the slope of a DEM mosaic on the target grid. See :func:`dem_slope`.
+
+        :param files: The DEM filenames
+        :param epsg: The target EPSG code
+        :param extent: The target extent as (xmin, ymin, xmax, ymax)
+        :param res: The target resolution (x, y)
+        :return: The slope as :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper`
+        """
+        te = self.te(extent)
+        key = RasterCache.make_key(files, layer="slope", epsg=epsg, extent=te, res=list(res))
+        return self._cached(key, lambda: dem_slope(files, epsg, te, res))
+
+
+_default = AuxiliaryLayers()
+
+
+def get_default():
+    """
+    Get the process-wide :class:`AuxiliaryLayers` service
+
+    :return: The service
+    """
+    return _default
+
+
+def set_default(service):
+    """
+    Replace the process-wide :class:`AuxiliaryLayers` service, e.g. by one with a disk cache.
+
+    :param service: The new service
+    """
+    global _default
+    _default = service
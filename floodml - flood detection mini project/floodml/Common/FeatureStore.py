@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Sharded, memory-mapped database of training samples.
+"""
+
+
+import os
+import json
+import uuid
+import numpy as np
+from Common import FileSystem
+
+
+class FeatureStore(object):
+    """
+    Training database made of shards of (features, labels, dates) .npy files and a json manifest.
+
+    Each shard holds the samples of one tile of one EMSR case. The EMSR ID and tile of a shard
+    are recorded in the manifest, so that a subset of the EMSR cases can be selected without
+    reading any sample. The shards are opened as memory maps.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, path, dtype=None):
+        """
+        Open a feature store. The store is created if not existing.
+
+        :param path: The folder of the store
+        :param dtype: The dtype of the features. One of 'float32' or 'float16'. Has to be the one of the manifest
+        for an existing store. Default is the one of the manifest, or float32 for a new store.
+        """
+        self.path = path
+        manifest = os.path.join(path, self.MANIFEST)
+        if os.path.isfile(manifest):
+            with open(manifest, "r") as f:
+                self.manifest = json.load(f)
+            if dtype is not None and np.dtype(dtype) != self.dtype:
+                raise ValueError("The feature store %s holds %s features, cannot add %s features."
+                                 % (path, self.dtype.name, np.dtype(dtype).name))
+        else:
+            dtype = dtype or "float32"
+            if np.dtype(dtype) not in (np.float32, np.float16):
+                raise ValueError("Unsupported feature dtype %s. Has to be float32 or float16." % dtype)
+            self.manifest = {"version": 1, "dtype": np.dtype(dtype).name, "n_features": None, "shards": []}
+
+    @staticmethod
+    def exists(path):
+        """
+        Check whether a folder contains a feature store
+
+        :param path: The folder
+        :return: True if the folder contains a manifest
+        """
+        return os.path.isfile(os.path.join(path, FeatureStore.MANIFEST))
+
+    @property
+    def dtype(self):
+        return np.dtype(self.manifest["dtype"])
+
+    @property
+    def shards(self):
+        return self.manifest["shards"]
+
+    def __len__(self):
+        return sum(s["rows"] for s in self.shards)
+
+    def write_shard(self, features, labels, emsr, tile, dates=None):
+        """
+        Write the samples of a tile as a new shard. The shard is not registered in the manifest,
+        so that shards can be written by several processes. See :func:`add`.
+
+        :param features: The (samples, features) array
+        :param labels: The (samples,) array of classes
+        :param emsr: The EMSR ID, e.g. 'EMSR123'
+        :param tile: The tile name
+        :param dates: Optional (samples,) array of YYYYMMDD acquisition dates
+        :return: The manifest entry of the shard
+        """
+        FileSystem.create_directory(self.path)
+        name = "%s_%s_%s" % (emsr, tile, uuid.uuid4().hex[:8])
+        rows = features.shape[0]
+        if dates is None:
+            dates = np.zeros(rows, dtype=np.uint32)
+        if labels.shape[0] != rows or dates.shape[0] != rows:
+            raise ValueError("Features, labels and dates need to have the same number of rows.")
+        np.save(os.path.join(self.path, "%s_X.npy" % name), np.asarray(features, dtype=self.dtype),
+                allow_pickle=False)
+        np.save(os.path.join(self.path, "%s_y.npy" % name), np.asarray(labels, dtype=np.uint8), allow_pickle=False)
+        np.save(os.path.join(self.path, "%s_date.npy" % name), np.asarray(dates, dtype=np.uint32),
+                allow_pickle=False)
+        classes = np.bincount(np.asarray(labels, dtype=np.uint8), minlength=2)
+        return {"name": name, "emsr": str(emsr), "tile": tile, "rows": int(rows),
+                "n_features": int(features.shape[1]) if features.ndim == 2 else 0,
+                "classes": [int(c) for c in classes]}
+
+    def add(self, entries, replace=None):
+        """
+        Register shards in the manifest and save it
+
+        :param entries: The manifest entries returned by :func:`write_shard`
+        :param replace: Optional EMSR IDs whose previous shards are replaced by the new ones.
+        Their files are only deleted once the new manifest is saved.
+        """
+        replaced = set(s["name"] for s in self.select(replace)) if replace else set()
+        self.manifest["shards"] = [s for s in self.shards if s["name"] not in replaced]
+        for entry in entries:
+            if not entry["rows"]:
+                continue
+            if self.manifest["n_features"] is None:
+                self.manifest["n_features"] = entry["n_features"]
+            if entry["n_features"] != self.manifest["n_features"]:
+                raise ValueError("Shard %s has %s features, expected %s" % (entry["name"], entry["n_features"],
+                                                                           self.manifest["n_features"]))
+            self.manifest["shards"].append(entry)
+        FileSystem.create_directory(self.path)
+        tmp = os.path.join(self.path, "%s.%s.tmp" % (self.MANIFEST, uuid.uuid4().hex))
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, self.MANIFEST))
+        self._delete_files(replaced)
+
+    def _delete_files(self, names):
+        """
+        Delete the files of shards not registered in the manifest anymore
+
+        :param names: The names of the shards
+        """
+        for name in names:
+            for suffix in ("_X.npy", "_y.npy", "_date.npy"):
+                FileSystem.remove_file(os.path.join(self.path, name + suffix))
+
+    def select(self, emsr_ids=None):
+        """
+        Select the shards of some EMSR cases
+
+        :param emsr_ids: The EMSR IDs, e.g. ['EMSR123'] or [123]. Default is all shards.
+        :return: The list of manifest entries
+        """
+        if emsr_ids is None:
+            return list(self.shards)
+        wanted = set(str(e) if str(e).startswith("EMSR") else "EMSR%s" % e for e in emsr_ids)
+        return [s for s in self.shards if s["emsr"] in wanted]
+
+    def open(self, entry, mmap_mode="r"):
+        """
+        Open a shard
+
+        :param entry: The manifest entry of the shard
+        :param mmap_mode: The memory map mode. Use None to read the shard into memory.
+        :return: The features, labels and dates arrays of the shard
+        """
+        base = os.path.join(self.path, entry["name"])
+        return (np.load(base + "_X.npy", mmap_mode=mmap_mode),
+                np.load(base + "_y.npy", mmap_mode=mmap_mode),
+                np.load(base + "_date.npy", mmap_mode=mmap_mode))
+
+    def remove(self, emsr_ids):
+        """
+        Remove the shards of some EMSR cases, e.g. before preparing them again
+
+        :param emsr_ids: The EMSR IDs, e.g. ['EMSR123'] or [123]
+        """
+        if self.select(emsr_ids):
+            self.add([], replace=emsr_ids)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Random forest flattened into contiguous numpy arrays, evaluated without sklearn.
+"""
+
+
+import os
+import zipfile
+import numpy as np
+
+# Chunk of (pixels x trees) nodes traversed at once
+NODES_PER_CHUNK = 1 << 19
+
+# Oldest and newest scikit-learn (major, minor) versions whose tree node layout to_sklearn was checked against
+SKLEARN_VERSIONS = ((0, 24), (1, 9))
+
+# Fields of the sklearn tree nodes filled by to_sklearn. Newer versions add missing_go_to_left.
+NODE_FIELDS = ("left_child", "right_child", "feature", "threshold", "impurity", "n_node_samples",
+               "weighted_n_node_samples")
+
+
+def _mmap_npz(path):
+    """
+    Memory-map the members of an uncompressed .npz file
+
+    :param path: The path to the .npz file
+    :return: Dict of the read-only memory-mapped arrays
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError("Cannot memory-map the compressed member %s of %s" % (info.filename, path))
+            # Local file header: 30 bytes, then the filename and extra field
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(f.read(4), dtype="<u2")
+            f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            arrays[os.path.splitext(info.filename)[0]] = np.memmap(f, dtype=dtype, mode="r", shape=shape,
+                                                                    order="F" if fortran else "C",
+                                                                    offset=f.tell())
+    return arrays
+
+
+class FeatureBins(object):
+    """
+    Bin edges of each feature: the sorted, unique thresholds of all splits on the feature.
+
+    A forest only compares the features against its thresholds, so replacing each feature by the number
+    of its edges below it does not change any split: x <= edges[k] if and only if bin(x) <= k.
+
+    A fully grown forest has about as many thresholds as training samples, i.e. uint32 bin indices and
+    no memory gain. Features computed as integers / scale (e.g. the optical indices scaled by 5000) can only
+    take the values of that grid: all thresholds between two consecutive values are then merged into one edge.
+    """
+
+    def __init__(self, edges, scales=None):
+        """
+        Create the bins of each feature
+
+        :param edges: The list of sorted float64 edges of each feature
+        :param scales: The scales the edges were merged with, see :func:`from_forest`
+        """
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.scales = tuple(scales) if scales else None
+
+    @staticmethod
+    def grid_edges(thresholds, scale):
+        """
+        Merge the thresholds which no value of the integers / scale grid lies between.
+        Each threshold is replaced by the largest grid value below it, or by -inf below the grid.
+
+        :param thresholds: The sorted thresholds of a feature
+        :param scale: The scale of the feature
+        :return: The sorted float64 edges
+        """
+        if not thresholds.size:
+            return thresholds
+        # Grid values as computed by the feature builders: float64 division, stored as float32
+        grid = (np.arange(np.floor(thresholds[0] * scale) - 1, np.ceil(thresholds[-1] * scale) + 2) /
+                scale).astype(np.float32).astype(np.float64)
+        below = np.searchsorted(grid, thresholds, side="right") - 1
+        return np.unique(np.where(below < 0, -np.inf, grid[np.maximum(below, 0)]))
+
+    @classmethod
+    def from_forest(cls, forest, scales=None):
+        """
+        Get the bins of the features of a forest
+
+        :param forest: The :class:`FlatForest`
+        :param scales: Optional scale of each feature computed as integers / scale, see :func:`grid_edges`.
+        None for the continuous features. Default is all features continuous.
+        :return: A FeatureBins object
+        """
+        split = ~np.asarray(forest.leaf)
+        feature = forest.feature[split]
+        threshold = forest.threshold[split]
+        n_features = int(feature.max()) + 1 if feature.size else 0
+        edges = [np.unique(threshold[feature == f]) for f in range(n_features)]
+        for f, scale in enumerate(scales or []):
+            if scale and f < n_features:
+                edges[f] = cls.grid_edges(edges[f], scale)
+        return cls(edges, scales)
+
+    @property
+    def dtype(self):
+        n_bins = max([e.size + 1 for e in self.edges] or [1])
+        for dtype in (np.uint8, np.uint16):
+            if n_bins <= np.iinfo(dtype).max + 1:
+                return np.dtype(dtype)
+        return np.dtype(np.uint32)
+
+    def encode(self, x):
+        """
+        Encode features as bin indices. NaN values are encoded as 0.0, as done before predicting.
+
+        :param x: The (samples, features) array
+        :return: The (samples, features) array of bin indices, of the smallest unsigned dtype
+        """
+        x = np.asarray(x)
+        if x.shape[1] < len(self.edges):
+            raise ValueError("Expected %s features, got %s" % (len(self.edges), x.shape[1]))
+        out = np.zeros(x.shape, dtype=self.dtype)
+        for f, edges in enumerate(self.edges):
+            # The splits are evaluated on float32 features, as done by sklearn
+            column = x[:, f].astype(np.float32)
+            column[np.isnan(column)] = 0
+            out[:, f] = np.searchsorted(edges, column, side="left")
+        return out
+
+
+class FlatForest(object):
+    """
+    Random forest classifier whose trees are stored as flat node arrays:
+
+    - feature, threshold: The split of each node. Samples with feature <= threshold go left.
+    - left: The global index of the left child of each node. The right child follows it.
+      Leaves point to themselves, with an infinite threshold.
+    - leaf: Whether each node is a leaf
+    - value: The class probabilities of each node
+    - roots: The index of the root node of each tree
+
+    All trees are traversed together, one level at a time.
+    :func:`to_sklearn` optionally rebuilds the sklearn forest, which traverses them about twice faster.
+    """
+
+    def __init__(self, feature, threshold, left, leaf, value, roots, classes, max_depth, n_features=None):
+        self.feature = np.asarray(feature)
+        self.threshold = np.asarray(threshold)
+        self.left = np.asarray(left)
+        self.leaf = np.asarray(leaf)
+        self.value = np.asarray(value)
+        self.roots = np.asarray(roots)
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+        # Forests written before the number of features was stored: The highest split feature is assumed
+        self.n_features_in_ = int(n_features) if n_features is not None else int(np.max(self.feature)) + 1
+        # Bin edges of the features, for a forest whose thresholds are bin indices. See :func:`quantise`.
+        self.bins = None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Flatten a trained sklearn forest
+
+        :param model: The trained :class:`sklearn.ensemble.RandomForestClassifier`
+        :return: A FlatForest object
+        """
+        feature, threshold, left, leaf, value, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            children_left, children_right = tree.children_left, tree.children_right
+            # Breadth-first numbering, so that both children of a node are neighbours
+            order = [np.zeros(1, dtype=np.int64)]
+            while order[-1].size:
+                parents = order[-1][children_left[order[-1]] >= 0]
+                order.append(np.column_stack((children_left[parents], children_right[parents])).ravel())
+            order = np.concatenate(order)
+            new_id = np.empty(order.size, dtype=np.int64)
+            new_id[order] = np.arange(order.size)
+
+            is_leaf = children_left[order] < 0
+            own = np.arange(order.size)
+            feature.append(np.where(is_leaf, 0, tree.feature[order]).astype(np.int32))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            left.append((np.where(is_leaf, own, new_id[np.maximum(children_left[order], 0)]) + offset).astype(np.int32))
+            leaf.append(is_leaf)
+            proba = tree.value[order, 0, :].astype(np.float32)
+            value.append(proba / np.maximum(proba.sum(axis=1, keepdims=True), np.finfo(np.float32).tiny))
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += order.size
+        return cls(np.concatenate(feature), np.concatenate(threshold), np.concatenate(left), np.concatenate(leaf),
+                   np.concatenate(value), np.array(roots, dtype=np.int32), model.classes_, max_depth,
+                   n_features=model.n_features_in_)
+
+    @staticmethod
+    def check_sklearn():
+        """
+        Check that the installed scikit-learn stores its trees the way :func:`to_sklearn` builds them.
+        The node layout is private to sklearn and may change with any release.
+
+        :raises ImportError: If sklearn is not installed
+        :raises RuntimeError: If the sklearn version or its tree node layout is not supported
+        """
+        import re
+        import sklearn
+        from sklearn.tree._tree import NODE_DTYPE
+        version = tuple(int(v) for v in re.findall(r"\d+", sklearn.__version__)[:2])
+        fields = set(NODE_DTYPE.names)
+        if not SKLEARN_VERSIONS[0] <= version <= SKLEARN_VERSIONS[1] or \
+                fields not in (set(NODE_FIELDS), set(NODE_FIELDS) | {"missing_go_to_left"}):
+            raise RuntimeError("Cannot rebuild the forest with scikit-learn %s (tree nodes %s). Supported are "
+                               "versions %s to %s. Predict with the FlatForest itself instead."
+                               % (sklearn.__version__, ", ".join(NODE_DTYPE.names),
+                                  ".".join(map(str, SKLEARN_VERSIONS[0])), ".".join(map(str, SKLEARN_VERSIONS[1]))))
+
+    def to_sklearn(self, n_jobs=None):
+        """
+        Rebuild the sklearn forest from the node arrays, so as to predict with its compiled traversal.
+        This relies on the private tree internals of sklearn, see :func:`check_sklearn`.
+        The node statistics which are not stored (impurity, number of samples) are left to 0.
+        The bins of a quantised forest are kept as ``bins`` attribute: its features have to be encoded first.
+
+        :param n_jobs: The number of jobs of the forest
+        :return: A fitted :class:`sklearn.ensemble.RandomForestClassifier`
+        :raises RuntimeError: If the installed sklearn is not supported
+        """
+        self.check_sklearn()
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.tree._tree import Tree, NODE_DTYPE, TREE_LEAF, TREE_UNDEFINED
+
+        n_classes = len(self.classes_)
+        ends = np.append(self.roots[1:], self.leaf.shape[0])
+        estimators = []
+        for root, end in zip(self.roots, ends):
+            root, end = int(root), int(end)
+            leaf = np.asarray(self.leaf[root:end])
+            left = np.asarray(self.left[root:end], dtype=np.int64) - root
+            # Levels of the breadth-first numbering
+            levels = [np.zeros(1, dtype=np.int64)]
+            while True:
+                split = levels[-1][~leaf[levels[-1]]]
+                if not split.size:
+                    break
+                levels.append(np.concatenate((left[split], left[split] + 1)))
+            # Depth-first numbering, as done by sklearn: Each subtree is then stored contiguously
+            size = np.ones(end - root, dtype=np.int64)
+            for level in reversed(levels):
+                split = level[~leaf[level]]
+                size[split] += size[left[split]] + size[left[split] + 1]
+            new_id = np.zeros(end - root, dtype=np.int64)
+            for level in levels:
+                split = level[~leaf[level]]
+                new_id[left[split]] = new_id[split] + 1
+                new_id[left[split] + 1] = new_id[split] + 1 + size[left[split]]
+
+            nodes = np.zeros(end - root, dtype=NODE_DTYPE)
+            nodes["left_child"][new_id] = np.where(leaf, TREE_LEAF, new_id[left])
+            nodes["right_child"][new_id] = np.where(leaf, TREE_LEAF, new_id[np.minimum(left + 1, end - root - 1)])
+            nodes["feature"][new_id] = np.where(leaf, TREE_UNDEFINED, self.feature[root:end])
+            nodes["threshold"][new_id] = np.where(leaf, TREE_UNDEFINED, self.threshold[root:end])
+            if "missing_go_to_left" in NODE_DTYPE.names:
+                # NaN values go left, as in :func:`apply`
+                nodes["missing_go_to_left"] = 1
+            values = np.empty((end - root, 1, n_classes), dtype=np.float64)
+            values[new_id, 0] = self.value[root:end]
+            tree = Tree(self.n_features_in_, np.array([n_classes], dtype=np.intp), 1)
+            tree.__setstate__({"max_depth": len(levels) - 1, "node_count": end - root, "nodes": nodes,
+                               "values": values})
+            estimator = DecisionTreeClassifier()
+            estimator.tree_ = tree
+            estimator.classes_ = self.classes_
+            estimator.n_classes_ = n_classes
+            estimator.n_outputs_ = 1
+            estimator.n_features_in_ = self.n_features_in_
+            estimator.max_features_ = self.n_features_in_
+            estimators.append(estimator)
+
+        model = RandomForestClassifier(n_estimators=len(estimators), n_jobs=n_jobs)
+        model.estimators_ = estimators
+        model.classes_ = self.classes_
+        model.n_classes_ = n_classes
+        model.n_outputs_ = 1
+        model.n_features_in_ = self.n_features_in_
+        if self.bins is not None:
+            model.bins = self.bins
+        return model
+
+    def save(self, path):
+        """
+        Write the forest as uncompressed .npz file, which can be memory-mapped
+
+        :param path: The path to the .npz file
+        """
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, leaf=self.leaf,
+                 value=self.value, roots=self.roots, classes=self.classes_, max_depth=np.array(self.max_depth),
+                 n_features=np.array(self.n_features_in_))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a forest written by :func:`save`
+
+        :param path: The path to the .npz file
+        :param mmap: Memory-map the node arrays instead of reading them. Default is True.
+        :return: A FlatForest object
+        """
+        if mmap:
+            arrays = _mmap_npz(path)
+        else:
+            with np.load(path) as npz:
+                arrays = {k: npz[k] for k in npz.files}
+        return cls(arrays["feature"], arrays["threshold"], arrays["left"], arrays["leaf"], arrays["value"],
+                   arrays["roots"], np.array(arrays["classes"]), arrays["max_depth"], arrays.get("n_features"))
+
+    def quantise(self, scales=None):
+        """
+        Get a copy of the forest working on binned features, see :class:`FeatureBins`.
+        The threshold of each split is replaced by the index of the largest edge below it, so that the
+        features can be encoded as bin indices before predicting. The predictions are the same, provided
+        that the features with a scale only take the values of their grid.
+
+        :param scales: Optional scale of each feature, see :func:`FeatureBins.from_forest`
+        :return: A FlatForest object with its ``bins`` set
+        """
+        if self.bins is not None:
+            return self
+        bins = FeatureBins.from_forest(self, scales)
+        threshold = np.full(self.threshold.shape, np.iinfo(np.int32).max, dtype=np.int32)
+        split = np.flatnonzero(~np.asarray(self.leaf))
+        for f, edges in enumerate(bins.edges):
+            nodes = split[self.feature[split] == f]
+            threshold[nodes] = np.searchsorted(edges, self.threshold[nodes], side="right") - 1
+        forest = FlatForest(self.feature, threshold, self.left, self.leaf, self.value, self.roots, self.classes_,
+                            self.max_depth, self.n_features_in_)
+        forest.bins = bins
+        return forest
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def apply(self, x):
+        """
+        Get the leaf reached in each tree
+
+        :param x: The (samples, features) array
+        :return: The (samples, trees) array of leaf indices
+        """
+        n_samples, n_features = x.shape
+        n_trees = len(self.roots)
+        values = np.ascontiguousarray(x).reshape(-1)
+        nodes = np.tile(self.roots, n_samples)
+        pos = np.arange(n_samples * n_trees)
+        base = (pos // n_trees) * n_features
+        leaves = np.empty(n_samples * n_trees, dtype=np.int32)
+        for depth in range(1, self.max_depth + 1):
+            nodes = self.left[nodes] + (values[base + self.feature[nodes]] > self.threshold[nodes])
+            if depth % 4 or depth == self.max_depth:
+                continue
+            # Drop the paths which reached a leaf, once they are numerous enough
+            done = self.leaf[nodes]
+            n_done = np.count_nonzero(done)
+            if n_done == done.size:
+                break
+            if n_done > done.size // 4:
+                leaves[pos[done]] = nodes[done]
+                keep = ~done
+                pos, nodes, base = pos[keep], nodes[keep], base[keep]
+        leaves[pos] = nodes
+        return leaves.reshape(n_samples, n_trees)
+
+    def predict_proba(self, x):
+        """
+        Predict the class probabilities, as the mean of the probabilities of all trees
+
+        :param x: The (samples, features) array
+        :return: The (samples, classes) array of probabilities
+        """
+        x = np.asarray(x)
+        if self.bins is not None and x.dtype.kind == "f":
+            x = self.bins.encode(x)
+        elif x.dtype.kind == "f":
+            # The splits are evaluated on float32 features, as done by sklearn
+            x = x.astype(np.float32, copy=False)
+        proba = np.empty((x.shape[0], self.value.shape[1]), dtype=np.float64)
+        chunk = max(1, NODES_PER_CHUNK // len(self.roots))
+        for start in range(0, x.shape[0], chunk):
+            leaves = self.apply(x[start:start + chunk])
+            proba[start:start + chunk] = self.value[leaves].mean(axis=1, dtype=np.float64)
+        return proba
+
+    def predict(self, x):
+        """
+        Predict the classes
+
+        :param x: The (samples, features) array
+        :return: The (samples,) array of classes
+        """
+        return self.classes_[np.argmax(self.predict_proba(x), axis=1)]
@@ -1,232 +1,359 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Copyright (C) CNES - All Rights Reserved
-This file is subject to the terms and conditions defined in
-file 'LICENSE.md', which is part of this source code package.
-
-Project:        FloodML, CNES
-"""
-
-
-
-from osgeo import gdal
-import re
-import uuid
-import numpy as np
-from Common import ImageIO
-
-
-class GDalDatasetWrapper(object):
-    """
-    Class to add some basic functionalities to the existing :class:`gdal.Dataset`.
-    """
-
-    def __init__(self, **kwargs):
-        """
-        Create a GDal dataset wrapper
-
-        :keyword ds: A `gdal.Dataset` object
-        :keyword array: A numpy array overwriting the one contained in the ds
-        :keyword projection: A gdal projection
-        :keyword geotransform: A gdal geotransform
-        :keyword nodata_value: Override nodata value
-        :keyword nodata_mask: Override nodata mask
-        """
-        # The following options overwrites the existing array in the ds:
-        array = kwargs.get("array", None)
-        ds = kwargs.get("ds", None)
-        projection = kwargs.get("projection", None)
-        geotransform = kwargs.get("geotransform", None)
-        nodata_mask = kwargs.get("nodata_mask", None)
-        # TODO Add value verification to unittests
-        nodata_sentinel = kwargs.get("nodata_value", "None")
-        if not ds and array is None:
-            raise KeyError("Need to provide GDAL dataset or array")
-        if not ds and (not projection or not geotransform):
-            raise KeyError("Need to provide projection+geotransform or GDAL dataset")
-
-        if array is not None:
-            self.array = array
-        else:
-            self.array = np.array(ds.ReadAsArray())
-
-        if ds is not None:
-            self._info = gdal.Info(ds, format='json')
-            self.projection = ds.GetProjection()
-            self.geotransform = ds.GetGeoTransform()
-        else:
-            self.projection = projection
-            self.geotransform = geotransform
-            self._info = gdal.Info(self.get_ds(), format='json')
-        self.resolution = self._resolution
-        self.epsg = self._epsg
-        self.utm_description = self._utm_description
-        self.ul_lr = self._ul_lr
-        if type(nodata_sentinel) != str:
-            self.nodata_value = nodata_sentinel
-        else:
-            self.nodata_value = self._nodata_value
-        if nodata_mask is not None:
-            assert nodata_mask.shape == self.array.shape
-            self.nodata_mask = np.array(nodata_mask, dtype=np.bool)
-        else:
-            self.nodata_mask = self._nodata_mask
-        ds = None  # Force closing of dataset if existing.
-
-    @classmethod
-    def from_file(cls, p_in):
-        """
-        Create a :class:`GDalDatasetWrapper` from a file
-
-        :param p_in: The path to the geo-referenced file
-        :return: A GDalDatasetWrapper object
-        """
-        ds = ImageIO.open_tiff(p_in)
-        return cls(ds=ds, p_in=p_in)
-    
-    def write(self, p_out, **kwargs):
-        """
-        Write the array to a given location
-
-        :param p_out: Location to write to, overrides internal `self._p_out` parameter
-        :keyword kwargs: Optional gdal keyword arguments.
-        :return: Writes array to given location
-        """
-        nodata = kwargs.pop("nodata", self.nodata_value)
-        driver = kwargs.pop("driver", "GTiff")
-        return ImageIO.gdal_write(driver, self.array, p_out, self.projection, self.geotransform,
-                                  nodata=nodata, **kwargs)
-
-    def get_ds(self):
-        """
-        Return a new copy of a :class:`gdal.Dataset`.
-
-        :return: A gdal dataset object
-        """
-        p_out = "/vsimem/" + uuid.uuid4().hex
-        return ImageIO.write_to_memory(self.array, p_out, self.projection, self.geotransform)
-
-    @property
-    def _resolution(self):
-        """
-        Get the resolution of a given driver in x and y
-
-        :return: The (x, y) resolution
-        :rtype: tuple of float
-        """
-        _, xres, _, _, _, yres = self.geotransform
-        return xres, yres
-
-    @property
-    def _epsg(self):
-        """
-        Get the EPSG code from the given driver using gdal
-
-        :return: The EPSG code if existing.
-        """
-        info = self._info['coordinateSystem']['wkt'].rsplit('"EPSG",', 1)[-1]
-        return int(re.findall(r"\d+", info)[0])
-
-    @property
-    def _nodata_value(self):
-        """
-        Get the NoDataValue (if existing) from the given driver using gdal
-
-        :return: The NoDataValue if existing. None if not.
-        """
-        try:
-            nodata = float(self._info["bands"][0]["noDataValue"])
-        except KeyError:
-            nodata = None
-        return nodata
-
-    @property
-    def _utm_description(self):
-        """
-        Get the UTM Description of the given driver using gdal
-
-        :return: The UTM Description as string.
-        """
-        # 'PROJCS' vs. 'PROJCRS' in rsplit
-        if int(gdal.VersionInfo()) >= 3000000:
-            ifo = self._info['coordinateSystem']['wkt'].rsplit('PROJCRS["', 1)[-1].split('"')[0]
-        else:
-            ifo = self._info['coordinateSystem']['wkt'].rsplit('PROJCS["', 1)[-1].split('"')[0]
-        return ifo
-
-    @property
-    def _ul_lr(self):
-        """
-        Get the coordinates of the upper left and lower right as tuples
-
-        :return: The ul and lr- coordinates in the projected coordinate system.
-        :rtype: tuple of float
-        """
-        ulx, xres, xskew, uly, yskew, yres = self.geotransform
-        lrx = ulx + (self.array.shape[1] * xres)
-        lry = uly + (self.array.shape[0] * yres)
-        return ulx, uly, lrx, lry
-
-    def extent(self, order="lonmin-latmin", dtype=float):
-        """
-        Return the gdal-typical xmin, ymin, xmax, ymax format for the raster extent
-        
-        :param order: Order in which the first two elements are arranged. One of 'lonmin-latmin' or 'lonmin-lonmax'.
-        :param dtype: The datatype in which each element is returned. Has to be one of [int, str, float].
-        Default is float. For all numeric types it returns a n-element tuple.
-        For string a single string concatenated by spaces.
-        :return: xmin, ymin, xmax, ymax
-        :rtype: tuple of dtype or str
-        """
-        ulx, uly, lrx, lry = self.ul_lr
-
-        if order == "lonmin-latmin":
-            elements = [ulx, lry, lrx, uly]
-        elif order == "lonmin-lonmax":
-            elements = [ulx, lrx, lry, uly]
-        else:
-            raise ValueError("Unknown extent order %s" % order)
-
-        if dtype == int:
-            return tuple([round(i) for i in elements])
-        if dtype == str:
-            return " ".join([str(round(i)) for i in elements])
-
-        return tuple(elements)
-
-    @property
-    def s2_epsg_code(self):
-        """
-        Get the Sentinel-2 EPSG Code for the current dataset
-        The codes range from 32601..60 and 32701..60
-
-        :return: The EPSG-Code as int. E.g. '32630'
-        :rtype: int
-        """
-        ul, lr = self.ul_lr
-        epsg_old = self.epsg
-        if epsg_old != 4326:
-            lat, lon = ImageIO.transform_point(ul, epsg_old)
-        else:
-            lat, lon = ul
-        lon_mod = int(lon / 6)
-
-        lon_code = str(30 + lon_mod if lon < 0 else 31 - lon_mod).zfill(2)
-        epsg = "327" if lat < 0 else "326"
-        return int(epsg + lon_code)
-
-    @property
-    def _nodata_mask(self):
-        """
-        Get a pixelwise nodata mask.
-
-        :return: A boolean numpy array where True==data in self.array and False==Nodata
-        """
-        if self.nodata_value is None:
-            return np.ones_like(self.array, dtype=np.bool)
-        return self.array != self.nodata_value
-
-
-if __name__ == "__main__":
-    pass
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+
+from osgeo import gdal, osr
+import re
+import numpy as np
+from Common import ImageIO
+
+
+class GDalDatasetWrapper(object):
+    """
+    Class to add some basic functionalities to the existing :class:`gdal.Dataset`.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Create a GDal dataset wrapper.
+        The array and the nodata mask are only read/computed when accessed for the first time.
+
+        :keyword ds: A `gdal.Dataset` object
+        :keyword array: A numpy array overwriting the one contained in the ds
+        :keyword projection: A gdal projection
+        :keyword geotransform: A gdal geotransform
+        :keyword nodata_value: Override nodata value
+        :keyword nodata_mask: Override nodata mask
+        :keyword sources: The datasets or arrays the ds reads from (e.g. the inputs of a VRT),
+        kept alive as long as the wrapper.
+        """
+        # The following options overwrites the existing array in the ds:
+        array = kwargs.get("array", None)
+        ds = kwargs.get("ds", None)
+        projection = kwargs.get("projection", None)
+        geotransform = kwargs.get("geotransform", None)
+        nodata_mask = kwargs.get("nodata_mask", None)
+        # TODO Add value verification to unittests
+        nodata_sentinel = kwargs.get("nodata_value", "None")
+        if not ds and array is None:
+            raise KeyError("Need to provide GDAL dataset or array")
+        if not ds and (not projection or not geotransform):
+            raise KeyError("Need to provide projection+geotransform or GDAL dataset")
+
+        self._ds = ds
+        self._array = array
+        # In-memory datasets only point at the buffers of their arrays:
+        self._sources = list(kwargs.get("sources", None) or [])
+        self._srs = None
+        self._json_info = None
+        if ds is not None:
+            self.projection = ds.GetProjection()
+            self.geotransform = ds.GetGeoTransform()
+        else:
+            self.projection = projection
+            self.geotransform = geotransform
+        if type(nodata_sentinel) != str:
+            self.nodata_value = nodata_sentinel
+        else:
+            self.nodata_value = self._nodata_value
+        if nodata_mask is not None:
+            assert nodata_mask.shape == self.array.shape
+            self._nodata_mask_override = np.array(nodata_mask, dtype=bool)
+        else:
+            self._nodata_mask_override = None
+
+    @property
+    def array(self):
+        """
+        The numpy array of the dataset. Read from the dataset on first access.
+        """
+        if self._array is None:
+            self._array = np.array(self._ds.ReadAsArray())
+        return self._array
+
+    @array.setter
+    def array(self, value):
+        self._array = value
+
+    def release_array(self):
+        """
+        Free the array read from the dataset. It is read again if accessed later.
+        Wrappers without a dataset keep their array, which cannot be read again.
+        """
+        if self._ds is not None:
+            self._array = None
+
+    @property
+    def nodata_mask(self):
+        """
+        A pixelwise nodata mask, computed on access.
+
+        :return: A boolean numpy array where True==data in self.array and False==Nodata
+        """
+        if self._nodata_mask_override is not None:
+            return self._nodata_mask_override
+        return self._nodata_mask
+
+    @nodata_mask.setter
+    def nodata_mask(self, value):
+        self._nodata_mask_override = value
+
+    @property
+    def _info(self):
+        """
+        The output of `gdal.Info` as json. Only computed when accessed.
+        """
+        if self._json_info is None:
+            self._json_info = gdal.Info(self._ds if self._ds is not None else self.get_ds(), format='json')
+        return self._json_info
+
+    @property
+    def srs(self):
+        """
+        The spatial reference of the dataset
+
+        :rtype: :class:`osr.SpatialReference`
+        """
+        if self._srs is None:
+            self._srs = osr.SpatialReference()
+            self._srs.ImportFromWkt(self.projection)
+        return self._srs
+
+    @property
+    def size(self):
+        """
+        Get the size of the raster in x and y without reading the array
+
+        :return: The (x, y) size in pixels
+        :rtype: tuple of int
+        """
+        if self._ds is not None:
+            return self._ds.RasterXSize, self._ds.RasterYSize
+        return self.array.shape[1], self.array.shape[0]
+
+    def decimated(self, step):
+        """
+        Get every step-th pixel of the array in x and y, e.g. for display.
+        If the array was not read yet, only these pixels are read, from the overviews of the file if any.
+
+        :param step: The decimation factor
+        :return: The array of shape (ceil(y / step), ceil(x / step)), with the bands first if any
+        """
+        if step <= 1:
+            return self.array
+        if self._array is None and self._ds is not None:
+            xsize, ysize = self.size
+            return np.array(self._ds.ReadAsArray(buf_xsize=-(-xsize // step), buf_ysize=-(-ysize // step),
+                                                 resample_alg=gdal.GRIORA_NearestNeighbour))
+        return self.array[..., ::step, ::step]
+
+    def read_window(self, xoff, yoff, xsize, ysize):
+        """
+        Get a window of a single-band raster.
+        If the array was not read yet, only the window is read from the dataset.
+
+        :param xoff: The column offset of the window
+        :param yoff: The line offset of the window
+        :param xsize: The number of columns of the window
+        :param ysize: The number of lines of the window
+        :return: The (ysize, xsize) array of the window
+        """
+        if self._array is None and self._ds is not None:
+            return np.array(self._ds.GetRasterBand(1).ReadAsArray(xoff, yoff, xsize, ysize))
+        return self.array[yoff:yoff + ysize, xoff:xoff + xsize]
+
+    @classmethod
+    def read_dataset(cls, ds):
+        """
+        Create a :class:`GDalDatasetWrapper` holding the array and the georeferencing of a dataset only,
+        so that the dataset itself (e.g. the MEM output of a GDAL operation) can be freed.
+
+        :param ds: The `gdal.Dataset` object
+        :return: A GDalDatasetWrapper object, with the bands of its array last
+        """
+        array = np.array(ds.ReadAsArray())
+        if array.ndim == 3:
+            array = np.moveaxis(array, 0, -1)
+        nodata = ds.GetRasterBand(1).GetNoDataValue()
+        return cls(array=array, projection=ds.GetProjection(), geotransform=ds.GetGeoTransform(),
+                   nodata_value=float(nodata) if nodata is not None else None)
+
+    @property
+    def nbytes(self):
+        """
+        The memory held by the wrapper: its array if read, and the raster of its dataset if held in memory.
+        """
+        nbytes = self._array.nbytes if self._array is not None else 0
+        # MEM datasets created by map_to_memory share the buffer of an array instead
+        if self._ds is not None and self._ds.GetDriver().ShortName == "MEM" and not hasattr(self._ds, "_array"):
+            bits = gdal.GetDataTypeSize(self._ds.GetRasterBand(1).DataType)
+            nbytes += self._ds.RasterXSize * self._ds.RasterYSize * self._ds.RasterCount * bits // 8
+        return nbytes
+
+    @classmethod
+    def from_file(cls, p_in):
+        """
+        Create a :class:`GDalDatasetWrapper` from a file
+
+        :param p_in: The path to the geo-referenced file
+        :return: A GDalDatasetWrapper object
+        """
+        ds = ImageIO.open_tiff(p_in)
+        return cls(ds=ds, p_in=p_in)
+    
+    def write(self, p_out, **kwargs):
+        """
+        Write the array to a given location
+
+        :param p_out: Location to write to, overrides internal `self._p_out` parameter
+        :keyword kwargs: Optional gdal keyword arguments. Use driver="COG" for a Cloud-Optimized GeoTiff,
+        see :func:`Common.ImageIO.write_cog`.
+        :return: Writes array to given location
+        """
+        nodata = kwargs.pop("nodata", self.nodata_value)
+        driver = kwargs.pop("driver", "GTiff")
+        if driver == "COG":
+            return ImageIO.write_cog(self.array, p_out, self.projection, self.geotransform, nodata=nodata, **kwargs)
+        return ImageIO.gdal_write(driver, self.array, p_out, self.projection, self.geotransform,
+                                  nodata=nodata, **kwargs)
+
+    def get_ds(self):
+        """
+        Return a :class:`gdal.Dataset` of the array. The dataset shares the memory of the array,
+        so that changes to one of them are visible in the other.
+
+        :return: A gdal dataset object
+        """
+        return ImageIO.map_to_memory(self.array, self.projection, self.geotransform)
+
+    @property
+    def resolution(self):
+        """
+        Get the resolution of a given driver in x and y
+
+        :return: The (x, y) resolution
+        :rtype: tuple of float
+        """
+        _, xres, _, _, _, yres = self.geotransform
+        return xres, yres
+
+    @property
+    def epsg(self):
+        """
+        Get the EPSG code from the spatial reference of the dataset
+
+        :return: The EPSG code if existing.
+        """
+        code = self.srs.GetAuthorityCode(None)
+        if code is None and self.srs.AutoIdentifyEPSG() == 0:
+            code = self.srs.GetAuthorityCode(None)
+        if code is None:
+            info = self.projection.rsplit('"EPSG",', 1)[-1]
+            code = re.findall(r"\d+", info)[0]
+        return int(code)
+
+    @property
+    def _nodata_value(self):
+        """
+        Get the NoDataValue (if existing) from the given driver using gdal
+
+        :return: The NoDataValue if existing. None if not.
+        """
+        if self._ds is None:
+            return None
+        nodata = self._ds.GetRasterBand(1).GetNoDataValue()
+        return float(nodata) if nodata is not None else None
+
+    @property
+    def utm_description(self):
+        """
+        Get the UTM Description from the spatial reference of the dataset
+
+        :return: The UTM Description as string.
+        """
+        return self.srs.GetAttrValue("PROJCS")
+
+    @property
+    def ul_lr(self):
+        """
+        Get the coordinates of the upper left and lower right as tuples
+
+        :return: The ul and lr- coordinates in the projected coordinate system.
+        :rtype: tuple of float
+        """
+        ulx, xres, xskew, uly, yskew, yres = self.geotransform
+        xsize, ysize = self.size
+        lrx = ulx + (xsize * xres)
+        lry = uly + (ysize * yres)
+        return ulx, uly, lrx, lry
+
+    def extent(self, order="lonmin-latmin", dtype=float):
+        """
+        Return the gdal-typical xmin, ymin, xmax, ymax format for the raster extent
+        
+        :param order: Order in which the first two elements are arranged. One of 'lonmin-latmin' or 'lonmin-lonmax'.
+        :param dtype: The datatype in which each element is returned. Has to be one of [int, str, float].
+        Default is float. For all numeric types it returns a n-element tuple.
+        For string a single string concatenated by spaces.
+        :return: xmin, ymin, xmax, ymax
+        :rtype: tuple of dtype or str
+        """
+        ulx, uly, lrx, lry = self.ul_lr
+
+        if order == "lonmin-latmin":
+            elements = [ulx, lry, lrx, uly]
+        elif order == "lonmin-lonmax":
+            elements = [ulx, lrx, lry, uly]
+        else:
+            raise ValueError("Unknown extent order %s" % order)
+
+        if dtype == int:
+            return tuple([round(i) for i in elements])
+        if dtype == str:
+            return " ".join([str(round(i)) for i in elements])
+
+        return tuple(elements)
+
+    @property
+    def s2_epsg_code(self):
+        """
+        Get the Sentinel-2 EPSG Code for the current dataset
+        The codes range from 32601..60 and 32701..60
+
+        :return: The EPSG-Code as int. E.g. '32630'
+        :rtype: int
+        """
+        ul, lr = self.ul_lr
+        epsg_old = self.epsg
+        if epsg_old != 4326:
+            lat, lon = ImageIO.transform_point(ul, epsg_old)
+        else:
+            lat, lon = ul
+        lon_mod = int(lon / 6)
+
+        lon_code = str(30 + lon_mod if lon < 0 else 31 - lon_mod).zfill(2)
+        epsg = "327" if lat < 0 else "326"
+        return int(epsg + lon_code)
+
+    @property
+    def _nodata_mask(self):
+        """
+        Get a pixelwise nodata mask.
+
+        :return: A boolean numpy array where True==data in self.array and False==Nodata
+        """
+        if self.nodata_value is None:
+            return np.ones_like(self.array, dtype=bool)
+        return self.array != self.nodata_value
+
+
+if __name__ == "__main__":
+    pass
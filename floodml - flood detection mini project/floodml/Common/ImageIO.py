@@ -1,189 +1,298 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Copyright (C) CNES - All Rights Reserved
-This file is subject to the terms and conditions defined in
-file 'LICENSE.md', which is part of this source code package.
-
-Project:        FloodML, CNES
-"""
-
-
-
-import os
-from osgeo import gdal, gdal_array, osr
-import numpy as np
-
-gdal.UseExceptions()
-
-
-def open_tiff(raster_file):
-    """
-    Opens a (tiff-):class:`gdal.Dataset` from a file path.
-
-    :param raster_file: Path to the given geo-referenced file
-    :return: A :class:`gdal.Dataset` object
-    """
-    if os.path.exists(raster_file):
-        return gdal.Open(raster_file)
-    raise NameError("GDAL could not open file {0}".format(raster_file))
-
-
-def tiff_to_array(raster_file, lon_offset_px=0, lat_offset_px=0, array_only=True, bands_last=True):
-    """
-    Opens a (tiff-)dataset and extracts the array.
-    Note: Bands index starts at 1, not at 0
-
-    :param raster_file: The File path
-    :param lon_offset_px: Offset for image in x-Direction
-    :param lat_offset_px: Offset for image in y-Direction
-    :param array_only: If `False`, then also return the :class:`gdal.Dataset` object.
-    :param bands_last: f `True`, eturn array of shape (y, x, bands) instead of (bands, y, x)
-    :return: The numpy array as well as the driver if `array_only=False`.
-    """
-    gdo = open_tiff(raster_file)
-    tiff_array = np.array(gdo.ReadAsArray(lon_offset_px, lat_offset_px))
-    if bands_last:
-        if tiff_array.ndim == 3:
-            tiff_array = np.moveaxis(tiff_array, 0, -1)
-        elif tiff_array.ndim == 2:
-            # tiff_array = tiff_array[..., np.newaxis]
-            # This is ok.
-            pass
-        else:
-            raise ValueError("Axis number must be 2 or 3.")
-    if array_only:
-        return tiff_array
-    return tiff_array, gdo
-
-
-def gdal_write(drv_type, img, dst, projection, coordinates, **kwargs):
-    """
-    General GDal Write function.
-    Writes array `img` to `dst`.
-
-    :param drv_type: The Driver type. E.g. "GTiff" or "MEM"
-    :type drv_type: str
-    :param img: The :class:`numpy.ndarray`
-    :param dst: The destination path
-    :param projection: A Gdal projection
-    :type projection: str
-    :param coordinates: A list of floats for the geotransform. See the description in :func:`write_geotiff`
-    :type coordinates: List of float
-    :keyword dtype: The desired gdal dtype
-    :keyword nodata: Assign a nodata value
-    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
-    :return: Writes array to `dst` and returns the dataset.
-    :rtype: :class:`gdal.Dataset`
-    """
-    dtype = kwargs.get("dtype", None)
-    nodata = kwargs.get("nodata", "None")
-    options = kwargs.get("options", [])
-    driver = gdal.GetDriverByName(drv_type)
-    # Add dimension for a single band-image
-    if img.ndim is 2:
-        img = img[..., np.newaxis]
-    # Set output dtype if not specified. GDAL cannot write GTiff as binary files, so convert to uint8:
-    if img.dtype == np.bool:
-        dtype = gdal_array.NumericTypeCodeToGDALTypeCode(np.uint8)
-    if img.dtype == np.int64:
-        dtype = gdal_array.NumericTypeCodeToGDALTypeCode(np.int32)
-    if not dtype:
-        dtype = gdal_array.NumericTypeCodeToGDALTypeCode(img.dtype)
-    img_h, img_w, n_bands = img.shape
-    mem = driver.Create(dst, img_w, img_h, n_bands, dtype, options)
-    mem.SetGeoTransform(coordinates)
-    mem.SetProjection(projection)
-
-    for bandIdx in range(n_bands):
-        band = img[:, :, bandIdx]
-        raster_band = mem.GetRasterBand(bandIdx + 1)
-        raster_band.WriteArray(band)
-        if str(nodata) != "None":
-            raster_band.SetNoDataValue(nodata)
-    mem.FlushCache()
-    return mem
-
-
-def write_to_memory(img, dst, projection, coordinates, **kwargs):
-    """
-
-    Writes an in-memory dataset using a given projection and geotransform
-
-    :param img: The numpy array to write
-    :param dst: The destination path
-    :param projection: The gdal projection as `str`
-    :param coordinates: The geotransform [Top-Left X, W-E Resolution, 0, Top Left Y, 0, N-S Resolution]
-    :keyword dtype: The desired gdal dtype
-    :keyword nodata: Assign a nodata value
-    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
-    :return: Writes image to given path. Returns 0 if all went well, 1 if not
-    :rtype: int
-    """
-    kwargs.pop("driver", None)
-    return gdal_write("MEM", img, dst, projection, coordinates, **kwargs)
-
-
-def write_geotiff(img, dst, projection, coordinates, **kwargs):
-    """
-
-    Writes a GeoTiff file using a given projection and geotransform
-
-    :param img: The numpy array to write
-    :param dst: The destination path
-    :param projection: The gdal projection as `str`
-    :param coordinates: The geotransform [Top-Left X, W-E Resolution, 0, Top Left Y, 0, N-S Resolution]
-    :keyword dtype: The desired gdal dtype
-    :keyword nodata: Assign a nodata value
-    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
-    :return: Writes image to given path. Returns 0 if all went well, 1 otherwise.
-    :rtype: int
-    """
-    kwargs.pop("driver", None)
-    ds = gdal_write("GTiff", img, dst, projection, coordinates, **kwargs)
-    if ds is not None:
-        ds = None
-        return 0
-    return 1
-
-
-def write_geotiff_existing(img, dst, ds, **kwargs):
-    """
-
-    Create a GeoTiff image with info from an existing dataset
-
-    :param img: The numpy array to write
-    :param dst: The destination path
-    :param ds: A gdal dataset
-    :keyword dtype: The desired gdal dtype
-    :keyword nodata: Assign a nodata value
-    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
-    :return: Writes image to given path. Returns 0 if all went well, 1 otherwise.
-    :rtype: int
-    """
-    geotransform = ds.GetGeoTransform()
-    projection = ds.GetProjection()
-    # Write the new array
-    return write_geotiff(img, dst, projection, geotransform, **kwargs)
-
-
-def transform_point(point, old_epsg, new_epsg=4326):
-    """
-    Transform a tuple (x,y) into lat lon using EPSG 4326
-
-    :param point: The point as tuple (x,y)
-    :param old_epsg: The EPSG code of the old coordinate system
-    :param new_epsg: The EPSG code of the new coordinate system to transfer to. Default is 4326 (WGS84).
-    :return: The point's location in the new epsg as (x, y) - z is omitted due to it being 0 most of the time
-    """
-    source = osr.SpatialReference()
-    source.ImportFromEPSG(old_epsg)
-
-    # The target projection
-    target = osr.SpatialReference()
-    target.ImportFromEPSG(new_epsg)
-    transform = osr.CoordinateTransformation(source, target)
-    new_pt = transform.TransformPoint(point[0], point[1])
-    if int(gdal.VersionInfo()) >= 3000000:
-        return new_pt[0], new_pt[1]
-    return new_pt[1], new_pt[0]
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+
+import os
+from osgeo import gdal, gdal_array, osr
+import numpy as np
+
+gdal.UseExceptions()
+
+
+def open_tiff(raster_file):
+    """
+    Opens a (tiff-):class:`gdal.Dataset` from a file path.
+
+    :param raster_file: Path to the given geo-referenced file
+    :return: A :class:`gdal.Dataset` object
+    """
+    if os.path.exists(raster_file):
+        return gdal.Open(raster_file)
+    raise NameError("GDAL could not open file {0}".format(raster_file))
+
+
+def tiff_to_array(raster_file, lon_offset_px=0, lat_offset_px=0, array_only=True, bands_last=True):
+    """
+    Opens a (tiff-)dataset and extracts the array.
+    Note: Bands index starts at 1, not at 0
+
+    :param raster_file: The File path
+    :param lon_offset_px: Offset for image in x-Direction
+    :param lat_offset_px: Offset for image in y-Direction
+    :param array_only: If `False`, then also return the :class:`gdal.Dataset` object.
+    :param bands_last: f `True`, eturn array of shape (y, x, bands) instead of (bands, y, x)
+    :return: The numpy array as well as the driver if `array_only=False`.
+    """
+    gdo = open_tiff(raster_file)
+    tiff_array = np.array(gdo.ReadAsArray(lon_offset_px, lat_offset_px))
+    if bands_last:
+        if tiff_array.ndim == 3:
+            tiff_array = np.moveaxis(tiff_array, 0, -1)
+        elif tiff_array.ndim == 2:
+            # tiff_array = tiff_array[..., np.newaxis]
+            # This is ok.
+            pass
+        else:
+            raise ValueError("Axis number must be 2 or 3.")
+    if array_only:
+        return tiff_array
+    return tiff_array, gdo
+
+
+def gdal_write(drv_type, img, dst, projection, coordinates, **kwargs):
+    """
+    General GDal Write function.
+    Writes array `img` to `dst`.
+
+    :param drv_type: The Driver type. E.g. "GTiff" or "MEM"
+    :type drv_type: str
+    :param img: The :class:`numpy.ndarray`
+    :param dst: The destination path
+    :param projection: A Gdal projection
+    :type projection: str
+    :param coordinates: A list of floats for the geotransform. See the description in :func:`write_geotiff`
+    :type coordinates: List of float
+    :keyword dtype: The desired gdal dtype
+    :keyword nodata: Assign a nodata value
+    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
+    :return: Writes array to `dst` and returns the dataset.
+    :rtype: :class:`gdal.Dataset`
+    """
+    dtype = kwargs.get("dtype", None)
+    nodata = kwargs.get("nodata", "None")
+    options = kwargs.get("options", [])
+    driver = gdal.GetDriverByName(drv_type)
+    # Add dimension for a single band-image
+    if img.ndim is 2:
+        img = img[..., np.newaxis]
+    # Set output dtype if not specified. GDAL cannot write GTiff as binary files, so convert to uint8:
+    if img.dtype == np.bool:
+        dtype = gdal_array.NumericTypeCodeToGDALTypeCode(np.uint8)
+    if img.dtype == np.int64:
+        dtype = gdal_array.NumericTypeCodeToGDALTypeCode(np.int32)
+    if not dtype:
+        dtype = gdal_array.NumericTypeCodeToGDALTypeCode(img.dtype)
+    img_h, img_w, n_bands = img.shape
+    mem = driver.Create(dst, img_w, img_h, n_bands, dtype, options)
+    mem.SetGeoTransform(coordinates)
+    mem.SetProjection(projection)
+
+    for bandIdx in range(n_bands):
+        band = img[:, :, bandIdx]
+        raster_band = mem.GetRasterBand(bandIdx + 1)
+        raster_band.WriteArray(band)
+        if str(nodata) != "None":
+            raster_band.SetNoDataValue(nodata)
+    mem.FlushCache()
+    return mem
+
+
+def write_to_memory(img, dst, projection, coordinates, **kwargs):
+    """
+
+    Writes an in-memory dataset using a given projection and geotransform
+
+    :param img: The numpy array to write
+    :param dst: The destination path
+    :param projection: The gdal projection as `str`
+    :param coordinates: The geotransform [Top-Left X, W-E Resolution, 0, Top Left Y, 0, N-S Resolution]
+    :keyword dtype: The desired gdal dtype
+    :keyword nodata: Assign a nodata value
+    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
+    :return: Writes image to given path. Returns 0 if all went well, 1 if not
+    :rtype: int
+    """
+    kwargs.pop("driver", None)
+    return gdal_write("MEM", img, dst, projection, coordinates, **kwargs)
+
+
+def map_to_memory(img, projection, coordinates, **kwargs):
+    """
+    Create an in-memory dataset pointing at the buffer of a numpy array, without copying it.
+    The array is referenced by the dataset, so that it lives at least as long as the dataset.
+
+    :param img: The numpy array of shape (y, x) or (y, x, bands)
+    :param projection: The gdal projection as `str`
+    :param coordinates: The geotransform [Top-Left X, W-E Resolution, 0, Top Left Y, 0, N-S Resolution]
+    :keyword nodata: Assign a nodata value
+    :return: The dataset sharing the memory of the array
+    :rtype: :class:`gdal.Dataset`
+    """
+    nodata = kwargs.get("nodata", "None")
+    # Add dimension for a single band-image
+    if img.ndim == 2:
+        img = img[..., np.newaxis]
+    # GDAL cannot handle binary or (older versions) 64bit integer rasters:
+    if img.dtype == bool:
+        img = img.view(np.uint8)
+    if img.dtype == np.int64:
+        img = img.astype(np.int32)
+    if min(img.strides) < 0:
+        img = np.ascontiguousarray(img)
+    dtype = gdal_array.NumericTypeCodeToGDALTypeCode(img.dtype)
+    img_h, img_w, n_bands = img.shape
+    mem = gdal.GetDriverByName("MEM").Create("", img_w, img_h, 0, dtype)
+    mem.SetGeoTransform(coordinates)
+    mem.SetProjection(projection)
+
+    address = img.__array_interface__["data"][0]
+    for bandIdx in range(n_bands):
+        mem.AddBand(dtype, ["DATAPOINTER=%d" % (address + bandIdx * img.strides[2]),
+                            "PIXELOFFSET=%d" % img.strides[1],
+                            "LINEOFFSET=%d" % img.strides[0]])
+        if str(nodata) != "None":
+            mem.GetRasterBand(bandIdx + 1).SetNoDataValue(nodata)
+    # The dataset does not own its buffer:
+    mem._array = img
+    return mem
+
+
+def write_geotiff(img, dst, projection, coordinates, **kwargs):
+    """
+
+    Writes a GeoTiff file using a given projection and geotransform
+
+    :param img: The numpy array to write
+    :param dst: The destination path
+    :param projection: The gdal projection as `str`
+    :param coordinates: The geotransform [Top-Left X, W-E Resolution, 0, Top Left Y, 0, N-S Resolution]
+    :keyword dtype: The desired gdal dtype
+    :keyword nodata: Assign a nodata value
+    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
+    :return: Writes image to given path. Returns 0 if all went well, 1 otherwise.
+    :rtype: int
+    """
+    kwargs.pop("driver", None)
+    ds = gdal_write("GTiff", img, dst, projection, coordinates, **kwargs)
+    if ds is not None:
+        ds = None
+        return 0
+    return 1
+
+
+def cog_compression():
+    """
+    Get the best lossless compression available for GeoTiff files: ZSTD if GDAL was built with it, else DEFLATE.
+
+    :return: The compression name
+    :rtype: str
+    """
+    creation_options = gdal.GetDriverByName("GTiff").GetMetadataItem("DMD_CREATIONOPTIONLIST") or ""
+    return "ZSTD" if "ZSTD" in creation_options else "DEFLATE"
+
+
+def write_cog(img, dst, projection, coordinates, **kwargs):
+    """
+
+    Writes a Cloud-Optimized GeoTiff: internal tiles, overviews, predictor and multi-threaded compression.
+    Falls back to a tiled GeoTiff with copied overviews if the COG driver is not available (GDAL < 3.1).
+
+    :param img: The numpy array to write
+    :param dst: The destination path
+    :param projection: The gdal projection as `str`
+    :param coordinates: The geotransform [Top-Left X, W-E Resolution, 0, Top Left Y, 0, N-S Resolution]
+    :keyword nodata: Assign a nodata value
+    :keyword resampling: The overview resampling. One of "NEAREST" or "MODE". Default is "NEAREST".
+    :keyword blocksize: The size of the internal tiles. Default is 512.
+    :keyword compress: The compression. Default is ZSTD if available, else DEFLATE.
+    :return: Writes image to given path. Returns 0 if all went well, 1 otherwise.
+    :rtype: int
+    """
+    mem = map_to_memory(img, projection, coordinates, nodata=kwargs.pop("nodata", "None"))
+    return copy_to_cog(mem, dst, **kwargs)
+
+
+def copy_to_cog(src, dst, **kwargs):
+    """
+
+    Copy a dataset to a Cloud-Optimized GeoTiff, e.g. a raster written window by window. See :func:`write_cog`.
+
+    :param src: The :class:`gdal.Dataset` to copy. Without the COG driver, its overviews are built in place.
+    :param dst: The destination path
+    :keyword resampling: The overview resampling. One of "NEAREST" or "MODE". Default is "NEAREST".
+    :keyword blocksize: The size of the internal tiles. Default is 512.
+    :keyword compress: The compression. Default is ZSTD if available, else DEFLATE.
+    :return: Writes image to given path. Returns 0 if all went well, 1 otherwise.
+    :rtype: int
+    """
+    resampling = kwargs.get("resampling", "NEAREST").upper()
+    blocksize = kwargs.get("blocksize", 512)
+    compress = kwargs.get("compress", None) or cog_compression()
+    options = ["COMPRESS=%s" % compress, "NUM_THREADS=ALL_CPUS", "BIGTIFF=IF_SAFER"]
+    cog = gdal.GetDriverByName("COG")
+    if cog is not None:
+        options += ["BLOCKSIZE=%s" % blocksize, "PREDICTOR=STANDARD", "OVERVIEW_RESAMPLING=%s" % resampling]
+        ds = cog.CreateCopy(dst, src, options=options)
+    else:
+        levels = []
+        while max(src.RasterXSize, src.RasterYSize) // 2 ** (len(levels) + 1) >= blocksize:
+            levels.append(2 ** (len(levels) + 1))
+        if levels:
+            src.BuildOverviews(resampling, levels)
+        options += ["TILED=YES", "BLOCKXSIZE=%s" % blocksize, "BLOCKYSIZE=%s" % blocksize, "PREDICTOR=2",
+                    "COPY_SRC_OVERVIEWS=YES"]
+        ds = gdal.GetDriverByName("GTiff").CreateCopy(dst, src, options=options)
+    if ds is not None:
+        ds = None
+        return 0
+    return 1
+
+
+def write_geotiff_existing(img, dst, ds, **kwargs):
+    """
+
+    Create a GeoTiff image with info from an existing dataset
+
+    :param img: The numpy array to write
+    :param dst: The destination path
+    :param ds: A gdal dataset
+    :keyword dtype: The desired gdal dtype
+    :keyword nodata: Assign a nodata value
+    :keyword options: Config options as a list of str, such as ["COMPRESS=DEFLATE"]
+    :return: Writes image to given path. Returns 0 if all went well, 1 otherwise.
+    :rtype: int
+    """
+    geotransform = ds.GetGeoTransform()
+    projection = ds.GetProjection()
+    # Write the new array
+    return write_geotiff(img, dst, projection, geotransform, **kwargs)
+
+
+def transform_point(point, old_epsg, new_epsg=4326):
+    """
+    Transform a tuple (x,y) into lat lon using EPSG 4326
+
+    :param point: The point as tuple (x,y)
+    :param old_epsg: The EPSG code of the old coordinate system
+    :param new_epsg: The EPSG code of the new coordinate system to transfer to. Default is 4326 (WGS84).
+    :return: The point's location in the new epsg as (x, y) - z is omitted due to it being 0 most of the time
+    """
+    source = osr.SpatialReference()
+    source.ImportFromEPSG(old_epsg)
+
+    # The target projection
+    target = osr.SpatialReference()
+    target.ImportFromEPSG(new_epsg)
+    transform = osr.CoordinateTransformation(source, target)
+    new_pt = transform.TransformPoint(point[0], point[1])
+    if int(gdal.VersionInfo()) >= 3000000:
+        return new_pt[0], new_pt[1]
+    return new_pt[1], new_pt[0]
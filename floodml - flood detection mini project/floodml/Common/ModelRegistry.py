@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+import os
+import json
+import hashlib
+import datetime
+import threading
+import joblib
+
+
+class ModelRegistry(object):
+    """
+    Process-wide cache of trained models, keyed by their file path.
+
+    Each model file is deserialised once and handed out again for every following request.
+    The file is checked for modifications (mtime and size first, content hash if they changed) on every access,
+    so that a long-running process picks up a newly written model without being restarted.
+    """
+
+    def __init__(self, mmap_mode="r"):
+        """
+        Create a new model registry
+
+        :param mmap_mode: The joblib memory-mapping mode used for the numpy arrays stored in the model file.
+        Use None to load the arrays fully into memory. Default is 'r' (read-only memory map).
+        """
+        self.mmap_mode = mmap_mode
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_hash(path, chunk_size=1 << 20):
+        """
+        Get the sha256 hash of a file
+
+        :param path: The path to the file
+        :param chunk_size: The number of bytes read at once
+        :return: The hex-digest of the file content
+        """
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _load(self, path):
+        """
+        Deserialise the model found at the given path
+
+        :param path: The path to the model file. Flattened forests (.npz) are loaded as
+        :class:`Common.FlatForest.FlatForest`, all other files with joblib.
+        :return: The model object
+        """
+        if path.endswith(".npz"):
+            from Common.FlatForest import FlatForest
+            return FlatForest.load(path, mmap=self.mmap_mode is not None)
+        try:
+            return joblib.load(path, mmap_mode=self.mmap_mode)
+        except ValueError:
+            # Compressed joblib files cannot be memory-mapped:
+            return joblib.load(path)
+
+    def get(self, path, sklearn=False):
+        """
+        Get the model stored at the given path. The model is only loaded again if the file content changed.
+
+        :param path: The path to the model file (e.g. a .sav or .npz file written by RDF-2-training)
+        :param sklearn: Rebuild a flattened forest as sklearn forest.
+        See :func:`Common.FlatForest.FlatForest.to_sklearn`
+        :return: The model object
+        """
+        model = self._get(path)
+        if not sklearn:
+            return model
+        from Common.FlatForest import FlatForest
+        if not isinstance(model, FlatForest):
+            return model
+        with self._lock:
+            entry = self._models[os.path.realpath(path)]
+            if "sklearn" not in entry:
+                entry["sklearn"] = entry["model"].to_sklearn()
+            return entry["sklearn"]
+
+    def _get(self, path):
+        """
+        Get the model stored at the given path, as it was deserialised. See :func:`get`.
+
+        :param path: The path to the model file
+        :return: The model object
+        """
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._models.get(path)
+            if entry and (entry["mtime"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+                return entry["model"]
+            digest = self.file_hash(path)
+            if entry and entry["hash"] == digest:
+                # File was touched, but the content is the same:
+                entry["mtime"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                return entry["model"]
+            print("\tLoading model %s" % path)
+            model = self._load(path)
+            self._models[path] = {"model": model,
+                                  "mtime": stat.st_mtime_ns,
+                                  "size": stat.st_size,
+                                  "hash": digest}
+            return model
+
+    def get_quantised(self, path, scales=None, sklearn=False):
+        """
+        Get the model stored at the given path, working on binned features.
+        The quantised model is only built again if the file content changed, see :func:`get`.
+
+        :param path: The path to the model file
+        :param scales: Optional scale of each feature, see :func:`Common.FlatForest.FeatureBins.from_forest`
+        :param sklearn: Rebuild the quantised forest as sklearn forest.
+        See :func:`Common.FlatForest.FlatForest.to_sklearn`
+        :return: The quantised forest, with its ``bins`` set. See :func:`Common.FlatForest.FlatForest.quantise`
+        """
+        from Common.FlatForest import FlatForest
+        self._get(path)
+        key = (tuple(scales) if scales else None, bool(sklearn))
+        with self._lock:
+            entry = self._models[os.path.realpath(path)]
+            quantised = entry.setdefault("quantised", {})
+            if key not in quantised:
+                model = entry["model"]
+                if not isinstance(model, FlatForest):
+                    model = FlatForest.from_sklearn(model)
+                model = model.quantise(key[0])
+                quantised[key] = model.to_sklearn() if sklearn else model
+            return quantised[key]
+
+    def clear(self):
+        """
+        Remove all models from the registry.
+        """
+        with self._lock:
+            self._models.clear()
+
+
+_registry = ModelRegistry()
+
+
+def load_model(path, sklearn=False):
+    """
+    Load a model using the process-wide :class:`ModelRegistry`
+
+    :param path: The path to the model file
+    :param sklearn: Rebuild a flattened forest as sklearn forest, see :func:`ModelRegistry.get`
+    :return: The model object
+    """
+    return _registry.get(path, sklearn)
+
+
+def load_quantised(path, scales=None, sklearn=False):
+    """
+    Load a model working on binned features using the process-wide :class:`ModelRegistry`
+
+    :param path: The path to the model file
+    :param scales: Optional scale of each feature, see :func:`ModelRegistry.get_quantised`
+    :param sklearn: Rebuild the quantised forest as sklearn forest, see :func:`ModelRegistry.get_quantised`
+    :return: The quantised model object
+    """
+    return _registry.get_quantised(path, scales, sklearn)
+
+
+def lineage_path(model_path):
+    """
+    Get the path of the lineage file of a model, e.g. 'DB_RDF_global_S1_lineage.json'
+
+    :param model_path: The path to the model file
+    :return: The path to the lineage file
+    """
+    return os.path.splitext(model_path)[0] + "_lineage.json"
+
+
+def read_lineage(model_path):
+    """
+    Read the versions a model went through
+
+    :param model_path: The path to the model file
+    :return: The list of versions, oldest first. Empty if the model has no lineage file.
+    """
+    path = lineage_path(model_path)
+    if not os.path.isfile(path):
+        return []
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def append_lineage(model_path, base_path=None, **info):
+    """
+    Add a new version to the lineage of a model, after the model has been written
+
+    :param model_path: The path to the model file
+    :param base_path: The path to the model the new version was trained from, if any.
+    Its lineage is carried over.
+    :param info: Description of the version, e.g. the EMSR cases and the number of trees
+    :return: The lineage
+    """
+    lineage = read_lineage(base_path) if base_path else []
+    version = {"version": len(lineage) + 1,
+               "date": datetime.datetime.now().isoformat(timespec="seconds"),
+               "sha256": ModelRegistry.file_hash(model_path),
+               "base": os.path.realpath(base_path) if base_path else None}
+    version.update(info)
+    lineage.append(version)
+    with open(lineage_path(model_path), "w") as f:
+        json.dump(lineage, f, indent=2)
+    return lineage
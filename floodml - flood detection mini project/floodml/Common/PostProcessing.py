@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Tiled, parallel majority filter of the classified rasters.
+"""
+
+
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from skimage.morphology import disk
+
+DEFAULT_TILE_SIZE = 1024
+# Labels not taking part in the vote: Nodata, clouds and cloud shadows
+DEFAULT_IGNORE = (255, 6, 7)
+
+
+def iter_tiles(shape, tile_size=DEFAULT_TILE_SIZE, halo=0):
+    """
+    Split a raster into tiles padded by a halo
+
+    :param shape: The (rows, cols) shape of the raster
+    :param tile_size: The size of a tile without its halo
+    :param halo: The width of the halo
+    :return: Generator of (padded tile, tile, tile inside the padded tile) slices
+    """
+    rows, cols = shape
+    for y in range(0, rows, tile_size):
+        for x in range(0, cols, tile_size):
+            y0, y1 = max(0, y - halo), min(rows, y + tile_size + halo)
+            x0, x1 = max(0, x - halo), min(cols, x + tile_size + halo)
+            tile = (slice(y, min(rows, y + tile_size)), slice(x, min(cols, x + tile_size)))
+            inner = (slice(y - y0, tile[0].stop - y0), slice(x - x0, tile[1].stop - x0))
+            yield (slice(y0, y1), slice(x0, x1)), tile, inner
+
+
+def footprint_rows(footprint):
+    """
+    Describe a footprint by the column range of each of its rows, e.g. for a disk
+
+    :param footprint: The footprint, centred, whose rows are contiguous
+    :return: The list of (row offset, first column offset, last column offset), relative to the centre
+    """
+    r0, c0 = footprint.shape[0] // 2, footprint.shape[1] // 2
+    rows = []
+    for i, row in enumerate(footprint):
+        cols = np.flatnonzero(row)
+        if cols.size:
+            rows.append((i - r0, int(cols[0]) - c0, int(cols[-1]) - c0))
+    return rows
+
+
+def _votes(mask, rows):
+    """
+    Count the pixels of a mask inside the footprint of each pixel, with a running histogram along the rows:
+    The count of a row segment is the difference of the cumulative counts at both its ends,
+    so that each pixel costs one subtraction per footprint row, whatever the radius.
+    Pixels outside the raster do not vote.
+
+    :param mask: The boolean mask
+    :param rows: The footprint of the filter, see :func:`footprint_rows`
+    :return: The counts, as uint16
+    """
+    n_rows, n_cols = mask.shape
+    pad = max(max(-lo, hi) for _, lo, hi in rows) + 1
+    # Cumulative counts, constant in the padding. Wrapping around uint16 keeps the differences exact.
+    cum = np.zeros((n_rows, n_cols + 2 * pad), dtype=np.uint16)
+    np.cumsum(mask, axis=1, dtype=np.uint16, out=cum[:, pad:pad + n_cols])
+    cum[:, pad + n_cols:] = cum[:, pad + n_cols - 1:pad + n_cols]
+    counts = np.zeros(mask.shape, dtype=np.uint16)
+    for dy, lo, hi in rows:
+        dst = slice(max(0, -dy), n_rows - max(0, dy))
+        src = slice(max(0, dy), n_rows + min(0, dy))
+        counts[dst] += cum[src, pad + hi:pad + hi + n_cols] - cum[src, pad + lo - 1:pad + lo - 1 + n_cols]
+    return counts
+
+
+def _majority_tile(labels, footprint, classes):
+    """
+    Majority filter of a padded tile. Ties are won by the lowest class, as done by skimage.
+
+    :param labels: The padded tile of labels
+    :param footprint: The footprint of the filter, see :func:`footprint_rows`
+    :param classes: The sorted classes taking part in the vote
+    :return: The filtered tile, and the mask of the pixels without any vote
+    """
+    if len(classes) == 2 and classes[0] == 0 and classes[1] == 1:
+        # Binary case: Flooded if more flooded than non-flooded neighbours
+        flood = _votes(labels == 1, footprint)
+        valid = flood + _votes(labels == 0, footprint)
+        return (2 * flood.astype(np.int32) > valid).astype(labels.dtype), valid == 0
+    best = np.zeros(labels.shape, dtype=labels.dtype)
+    best_count = np.zeros(labels.shape, dtype=np.uint16)
+    for c in classes:
+        count = _votes(labels == c, footprint)
+        better = count > best_count
+        best[better] = c
+        best_count[better] = count[better]
+    return best, best_count == 0
+
+
+def majority_filter(labels, radius=2, ignore=DEFAULT_IGNORE, out=None, tile_size=DEFAULT_TILE_SIZE,
+                    n_workers=None):
+    """
+    Majority filter over a disk, computed on halo-padded tiles in parallel.
+    The ignored labels do not vote and are kept as they are, as are the pixels without any vote.
+    The numpy kernels of the vote release the GIL, so that the tiles are filtered by threads.
+
+    :param labels: The (rows, cols) array of labels
+    :param radius: The radius of the disk. Default is 2.
+    :param ignore: The labels not taking part in the vote. Default is nodata, clouds and shadows.
+    :param out: Optional preallocated output, of the shape and dtype of the labels
+    :param tile_size: The size of a tile without its halo
+    :param n_workers: The number of tiles filtered in parallel. Default is the number of CPUs.
+    :return: The filtered labels
+    """
+    if out is None:
+        out = np.empty_like(labels)
+    footprint = footprint_rows(disk(radius))
+    present = np.flatnonzero(np.bincount(labels.ravel(), minlength=256)) if labels.dtype == np.uint8 \
+        else np.unique(labels)
+    classes = [c for c in present if c not in set(ignore)]
+    ignored = np.isin(labels, list(ignore)) if len(classes) != len(present) else None
+
+    def filter_tile(padded, tile, inner):
+        filtered, no_vote = _majority_tile(labels[padded], footprint, classes)
+        filtered, no_vote = filtered[inner], no_vote[inner]
+        keep = no_vote if ignored is None else no_vote | ignored[tile]
+        out[tile] = np.where(keep, labels[tile], filtered)
+
+    n_workers = n_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        for future in [executor.submit(filter_tile, *t) for t in iter_tiles(labels.shape, tile_size, radius)]:
+            future.result()
+    return out
+
+
+def _ocs_lut():
+    """
+    Get the OCS class of each (post-processed class, WorldCover class) pair:
+    1-Flood 2-Forest 3-Forest+Flood 4-Urban 5-Urban+Flood. Other classes (clouds, nodata) are kept.
+
+    :return: The (256, 256) uint8 look-up table
+    """
+    lut = np.repeat(np.arange(256, dtype=np.uint8)[:, np.newaxis], 256, axis=1)
+    lut[[0, 1], 10] += 2  # Forest
+    lut[[0, 1], 50] += 4  # Urban
+    return lut
+
+
+OCS_LUT = _ocs_lut()
+
+
+def ocs_classes(post, worldcover):
+    """
+    Combine the post-processed classes with the ESA WorldCover classes, in a single look-up
+
+    :param post: The post-processed classes, as uint8
+    :param worldcover: The ESA WorldCover classes on the same grid
+    :return: The uint8 OCS classes
+    """
+    if worldcover.dtype != np.uint8:
+        worldcover = worldcover.astype(np.uint8)
+    return OCS_LUT[post, worldcover]
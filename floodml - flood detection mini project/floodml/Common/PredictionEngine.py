@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Block-wise, parallel prediction of a per-pixel feature stack into a preallocated output raster.
+"""
+
+
+import os
+import copy
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+DEFAULT_MEMORY_BUDGET = 2048 * 1024 ** 2  # Bytes
+MIN_BLOCK_ROWS = 4096
+
+# Worker-process state for the process backend
+_worker_model = None
+
+
+def in_flight(n_workers):
+    """
+    Get the number of blocks submitted at the same time: one running and one queued per worker
+
+    :param n_workers: The number of workers
+    :return: The number of blocks in flight
+    """
+    return 2 * max(1, n_workers)
+
+
+def row_bytes(n_features, itemsize=8, n_classes=2):
+    """
+    Get the memory needed to predict a row (pixel)
+
+    :param n_features: The number of features per pixel
+    :param itemsize: The itemsize of the input features in bytes
+    :param n_classes: The number of classes of the model
+    :return: The number of bytes
+    """
+    # Input block, its float32 copy made by the forest, and the class probabilities accumulated by the forest
+    return n_features * (itemsize + 4) + 3 * n_classes * 8
+
+
+def block_rows(n_features, memory_budget=DEFAULT_MEMORY_BUDGET, n_blocks=1, itemsize=8, n_classes=2):
+    """
+    Get the number of rows (pixels) per block so that all blocks in flight stay inside the memory budget
+
+    :param n_features: The number of features per pixel
+    :param memory_budget: The memory budget in bytes shared by all blocks
+    :param n_blocks: The number of blocks in flight at the same time, see :func:`in_flight`
+    :param itemsize: The itemsize of the input features in bytes
+    :param n_classes: The number of classes of the model
+    :return: The number of rows per block
+    """
+    rows = int(memory_budget // (row_bytes(n_features, itemsize, n_classes) * max(1, n_blocks)))
+    return max(MIN_BLOCK_ROWS, rows)
+
+
+def _single_threaded(model):
+    """
+    Get a shallow copy of the model which does not spawn its own threads when predicting.
+    The trees themselves are shared with the original model.
+
+    :param model: The trained model
+    :return: The model, or a copy of it with n_jobs set to 1
+    """
+    if getattr(model, "n_jobs", None) in (None, 1):
+        return model
+    model = copy.copy(model)
+    model.n_jobs = 1
+    return model
+
+
+def _predict_block(model, block):
+    """
+    Predict a single block of features. NaN values are set to 0 before predicting.
+
+    :param model: The trained model
+    :param block: The (rows, n_features) block of features
+    :return: The predicted classes of the block
+    """
+    nan = np.isnan(block) if block.dtype.kind == "f" else None
+    if nan is not None and nan.any():
+        if not block.flags.writeable:
+            block = block.copy()
+        block[nan] = 0
+    return model.predict(block)
+
+
+def _init_worker(model_path, quantise=False, scales=None, sklearn=False):
+    """
+    Load the model once for each worker process
+
+    :param model_path: The path to the model file
+    :param quantise: Predict binned features, see :func:`Common.FlatForest.FlatForest.quantise`
+    :param scales: The scales of the binned features
+    :param sklearn: Rebuild flattened forests as sklearn forests, see :func:`Common.ModelRegistry.load_model`
+    """
+    from Common.ModelRegistry import load_model, load_quantised
+    global _worker_model
+    if quantise:
+        _worker_model = load_quantised(model_path, scales, sklearn)
+    else:
+        _worker_model = load_model(model_path, sklearn)
+    _worker_model = _single_threaded(_worker_model)
+
+
+def _predict_block_worker(block):
+    return _predict_block(_worker_model, block)
+
+
+def create_executor(model, n_workers=None, backend="thread", model_path=None):
+    """
+    Create the pool of workers predicting the blocks. The pool can be shared by several calls of
+    :func:`predict_blocks`, so that the workers of the 'process' backend only start and load the model once.
+
+    :param model: The trained model. The 'process' backend only checks whether it is quantised and flattened.
+    :param n_workers: The number of workers. Default is the number of CPUs.
+    :param backend: One of 'thread' or 'process'. The 'process' backend needs the ``model_path``.
+    :param model_path: The path to the model file, loaded once by every worker of the 'process' backend
+    :return: The :class:`concurrent.futures.Executor`, to be shut down by the caller
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers=n_workers)
+    if backend == "process":
+        if not model_path:
+            raise ValueError("The process backend needs a model_path.")
+        from Common.FlatForest import FlatForest
+        bins = getattr(model, "bins", None)
+        # The workers predict with the same kind of forest as the given model
+        return ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                   initargs=(model_path, bins is not None, bins.scales if bins else None,
+                                             not isinstance(model, FlatForest)))
+    raise ValueError("Unknown backend %s. Has to be 'thread' or 'process'." % backend)
+
+
+def predict_blocks(model, features, out=None, memory_budget=DEFAULT_MEMORY_BUDGET, n_workers=None,
+                   backend="thread", model_path=None, verbose=True, executor=None):
+    """
+    Predict a feature stack block by block, writing the classes directly into a preallocated output
+
+    :param model: The trained model. The 'process' backend only checks whether it is quantised and flattened.
+    :param features: The (n_pixels, n_features) feature stack
+    :param out: The preallocated, C-contiguous output array with n_pixels elements, e.g. of shape (rows, cols).
+    If None, a new uint8 array of shape (n_pixels,) is allocated.
+    :param memory_budget: Memory budget in bytes for all blocks in flight
+    :param n_workers: The number of blocks predicted in parallel. Default is the number of CPUs.
+    :param backend: One of 'thread' or 'process'. The 'process' backend needs the ``model_path``.
+    :param model_path: The path to the model file, loaded once by every worker of the 'process' backend
+    :param verbose: Print the number of blocks. Default is True.
+    :param executor: Optional pool created by :func:`create_executor` with the same ``n_workers``.
+    Default is a new pool, shut down when done.
+    :return: The output array
+    """
+    n_pixels, n_features = features.shape
+    if out is None:
+        out = np.empty(n_pixels, dtype=np.uint8)
+    if out.size != n_pixels or not out.flags.c_contiguous:
+        raise ValueError("Output needs to be C-contiguous and of size %s" % n_pixels)
+    out_flat = out.reshape(-1)
+    n_workers = n_workers or os.cpu_count() or 1
+    n_blocks = in_flight(n_workers)
+    rows = block_rows(n_features, memory_budget, n_blocks, itemsize=features.itemsize)
+    starts = list(range(0, n_pixels, rows))
+    if verbose:
+        print("\tPredicting %s blocks of %s pixels using %s %s worker(s)" % (len(starts), rows, n_workers, backend))
+
+    own_executor = executor is None
+    if own_executor:
+        executor = create_executor(model, n_workers, backend, model_path)
+    if isinstance(executor, ProcessPoolExecutor):
+        def submit(start):
+            return executor.submit(_predict_block_worker, np.ascontiguousarray(features[start:start + rows]))
+    else:
+        model = _single_threaded(model) if n_workers > 1 else model
+
+        def submit(start):
+            return executor.submit(_predict_block, model, features[start:start + rows])
+
+    # Keep a bounded number of blocks in flight to bound the peak memory
+    try:
+        pending = {}
+        for start in starts:
+            if len(pending) >= n_blocks:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    begin = pending.pop(future)
+                    out_flat[begin:begin + rows] = future.result()
+            pending[submit(start)] = start
+        for future, begin in pending.items():
+            out_flat[begin:begin + rows] = future.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return out
+
+
+def _row_keys(block):
+    """
+    Get a key per row of a feature block, equal for rows with equal features.
+    NaN values are set to 0 and -0.0 to 0.0 beforehand, as done before predicting.
+
+    :param block: The (rows, n_features) block of features
+    :return: The (rows,) array of keys
+    """
+    if block.dtype.kind == "f":
+        block = np.where(np.isnan(block), 0, block) + block.dtype.type(0)
+    block = np.ascontiguousarray(block)
+    row_bytes = block.shape[1] * block.itemsize
+    if row_bytes in (1, 2, 4, 8):
+        return block.view("u%s" % row_bytes).reshape(-1)
+    return block.view(np.dtype((np.void, row_bytes))).reshape(-1)
+
+
+def predict_unique(model, features, out=None, memory_budget=DEFAULT_MEMORY_BUDGET, n_workers=None,
+                   backend="thread", model_path=None, verbose=True, executor=None):
+    """
+    Predict only the distinct feature tuples of each block and scatter the classes back to the pixels.
+    Worth it for low-cardinality feature spaces, e.g. the S2 indices quantised to int16 / 5000.
+
+    See :func:`predict_blocks` for the parameters.
+    :return: The output array
+    """
+    n_pixels, n_features = features.shape
+    if out is None:
+        out = np.empty(n_pixels, dtype=np.uint8)
+    if out.size != n_pixels or not out.flags.c_contiguous:
+        raise ValueError("Output needs to be C-contiguous and of size %s" % n_pixels)
+    out_flat = out.reshape(-1)
+    # Half of the budget for the block, its keys, the sorted keys and the inverse indices,
+    # the other half for the prediction of its distinct rows
+    memory_budget //= 2
+    rows = max(MIN_BLOCK_ROWS, int(memory_budget // (2 * n_features * features.itemsize + 3 * 8)))
+    n_unique = 0
+    n_workers = n_workers or os.cpu_count() or 1
+    # A single pool for all blocks
+    own_executor = executor is None
+    if own_executor:
+        executor = create_executor(model, n_workers, backend, model_path)
+    try:
+        for start in range(0, n_pixels, rows):
+            block = features[start:start + rows]
+            _, first, inverse = np.unique(_row_keys(block), return_index=True, return_inverse=True)
+            labels = predict_blocks(model, block[first], memory_budget=memory_budget, n_workers=n_workers,
+                                    backend=backend, verbose=False, executor=executor)
+            out_flat[start:start + block.shape[0]] = labels[inverse.reshape(-1)]
+            n_unique += first.size
+    finally:
+        if own_executor:
+            executor.shutdown()
+    if verbose:
+        print("\tPredicted %s distinct feature tuples for %s pixels" % (n_unique, n_pixels))
+    return out
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+import numpy as np
+from osgeo import gdal
+from Common.GDalDatasetWrapper import GDalDatasetWrapper
+
+# Lines of the input image read at once. A multiple of 8, so that the packed bitmasks of all strips can be joined.
+STRIP_LINES = 1024
+
+
+class ProductContext(object):
+    """
+    Georeferencing, nodata and cloud masks of the image a product is inferred on.
+
+    The image is read once, strip by strip; its georeferencing is reused for all exports of the product
+    and its nodata and cloud pixels are kept as packed bitmasks. The pixels themselves are not kept.
+    """
+
+    def __init__(self, ds, nodata=0, clouds=None):
+        """
+        Create a product context
+
+        :param ds: The input image as :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper`
+        :param nodata: The value of the nodata pixels in the input image. Default is 0.
+        :param clouds: Optional function computing the boolean cloud mask from the pixels of the input image,
+        e.g. :func:`Common.RDF_tools.ldt_cloud_mask`. Default is no cloud mask.
+        """
+        self.ds = ds
+        xsize, ysize = ds.size
+        self.shape = (ysize, xsize)
+        nodata_bits, cloud_bits = [], []
+        for yoff in range(0, ysize, STRIP_LINES):
+            strip = ds.read_window(0, yoff, xsize, min(STRIP_LINES, ysize - yoff))
+            nodata_bits.append(np.packbits(strip == nodata, axis=None))
+            if clouds is not None:
+                cloud_bits.append(np.packbits(clouds(strip), axis=None))
+        self._nodata_bits = np.concatenate(nodata_bits)
+        self._cloud_bits = np.concatenate(cloud_bits) if clouds is not None else None
+        # Only the georeferencing of the dataset is needed from now on
+        ds.release_array()
+
+    @classmethod
+    def from_file(cls, filename, nodata=0, clouds=None):
+        """
+        Create a :class:`ProductContext` from a file
+
+        :param filename: The path to the input image
+        :param nodata: The value of the nodata pixels in the input image. Default is 0.
+        :param clouds: Optional function computing the cloud mask, see :class:`ProductContext`
+        :return: A ProductContext object
+        """
+        return cls(GDalDatasetWrapper.from_file(filename), nodata=nodata, clouds=clouds)
+
+    @property
+    def projection(self):
+        return self.ds.projection
+
+    @property
+    def geotransform(self):
+        return self.ds.geotransform
+
+    @property
+    def epsg(self):
+        return self.ds.epsg
+
+    @property
+    def resolution(self):
+        return self.ds.resolution
+
+    @property
+    def ul_lr(self):
+        return self.ds.ul_lr
+
+    def extent(self, order="lonmin-latmin", dtype=float):
+        """
+        See :func:`Common.GDalDatasetWrapper.GDalDatasetWrapper.extent`
+        """
+        return self.ds.extent(order=order, dtype=dtype)
+
+    @property
+    def nodata_mask(self):
+        """
+        Get the pixelwise nodata mask.
+
+        :return: A boolean numpy array where True==Nodata
+        """
+        return self._unpack(self._nodata_bits)
+
+    @property
+    def cloud_mask(self):
+        """
+        Get the pixelwise cloud mask computed when reading the input image.
+
+        :return: A boolean numpy array where True==Cloud. None if no cloud mask was computed.
+        """
+        return self._unpack(self._cloud_bits) if self._cloud_bits is not None else None
+
+    def nodata_lines(self, yoff, ysize):
+        """
+        Get the nodata mask of full-width lines of the input image
+
+        :param yoff: The first line
+        :param ysize: The number of lines
+        :return: A boolean numpy array of shape (ysize, columns) where True==Nodata
+        """
+        return self._unpack(self._nodata_bits, yoff, ysize)
+
+    def cloud_lines(self, yoff, ysize):
+        """
+        Get the cloud mask of full-width lines of the input image
+
+        :param yoff: The first line
+        :param ysize: The number of lines
+        :return: A boolean numpy array of shape (ysize, columns) where True==Cloud. None if no cloud mask was computed.
+        """
+        return self._unpack(self._cloud_bits, yoff, ysize) if self._cloud_bits is not None else None
+
+    def _unpack(self, bits, yoff=0, ysize=None):
+        ysize = self.shape[0] - yoff if ysize is None else ysize
+        # Bits of the lines, starting inside the first byte
+        start, count = yoff * self.shape[1], ysize * self.shape[1]
+        first = start % 8
+        lines = np.unpackbits(bits[start // 8:(start + count + 7) // 8], count=first + count)[first:]
+        return lines.view(bool).reshape(ysize, self.shape[1])
+
+    def apply_nodata(self, array, value=255, yoff=0):
+        """
+        Set the nodata pixels of an array of the same shape as the input image, or of some of its lines
+
+        :param array: The array, modified in place
+        :param value: The value to be set. Default is 255.
+        :param yoff: The line of the input image the array starts at. Default is 0.
+        :return: The modified array
+        """
+        array[self.nodata_lines(yoff, array.shape[0])] = value
+        return array
+
+    def dataset(self, array):
+        """
+        Get a dataset on the grid of the input image
+
+        :param array: The array of the same shape as the input image
+        :return: A :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper` object
+        """
+        return GDalDatasetWrapper(array=array, projection=self.projection, geotransform=self.geotransform)
+
+    def create_file(self, path, n_bands=1, nodata=255):
+        """
+        Create an empty uint8 GeoTiff on the grid of the input image, e.g. to be written window by window
+
+        :param path: The path of the file
+        :param n_bands: The number of bands. Default is 1.
+        :param nodata: The nodata value of the bands. Default is 255.
+        :return: The :class:`gdal.Dataset`, opened for writing
+        """
+        ds = gdal.GetDriverByName("GTiff").Create(path, self.shape[1], self.shape[0], n_bands, gdal.GDT_Byte,
+                                                  ["BIGTIFF=IF_SAFER"])
+        ds.SetGeoTransform(self.geotransform)
+        ds.SetProjection(self.projection)
+        for i in range(n_bands):
+            ds.GetRasterBand(i + 1).SetNoDataValue(nodata)
+        return ds
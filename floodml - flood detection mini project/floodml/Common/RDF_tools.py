@@ -1,430 +1,523 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Copyright (C) CNES - All Rights Reserved
-This file is subject to the terms and conditions defined in
-file 'LICENSE.md', which is part of this source code package.
-
-Project:        FloodML, CNES
-"""
-
-
-import numpy as np
-import os
-import gc
-from scipy.ndimage.filters import uniform_filter
-from scipy.ndimage.measurements import variance
-from functools import reduce
-from Common.GDalDatasetWrapper import GDalDatasetWrapper
-from Common.ImageTools import gdal_warp, gdal_buildvrt
-from Common import FileSystem
-from Common import ImageTools
-from Chain import Product
-from skimage.filters.rank import majority
-from skimage.morphology import disk, ball
-import matplotlib.pyplot as plt
-            
-s2_bands = ["B01", "B02", "B03", "B04", "B05", "B06", "B07", "B08", "B8A", "B09", "B11", "B12", "SCL"]
-
-
-def s1_prep_stack_builder(s1_vv, slp_norm, idx_reject_gswo, idx_reject_slp, mask_gswo, imask_roi, imask_rdn,
-                          vstack_s1, rdn_stack):
-    """
-    S1 parsing and processing (VV & VH) with GSWO (water ground truth) and MERIT (slope)
-
-    :param s1_vv: S1 file list
-    :param slp_norm: Normalized slope array
-    :param idx_reject_gswo: Rejected GSWO mask values
-    :param idx_reject_slp: Rejected MERIT slope values
-    :param mask_gswo: Selected pixels (water pixels at >90% occurrence)
-    :param imask_roi: index map of ROI
-    :param imask_rdn: index of random pixels (random non-water)
-    :param vstack_s1: Input S1 Water stack
-    :param rdn_stack: Input S1 rdn stack
-    :return: S1 Water and rdn_stack stacks
-    """
-
-    for j, s1 in enumerate(s1_vv):
-
-        print("\t", s1)
-
-        name_vh = s1.replace("vv", "vh")
-        if os.path.exists(name_vh):
-            print("\t", name_vh)
-
-            # VV and VH array loading
-            ds_vv = GDalDatasetWrapper.from_file(s1)
-            ds_vh = GDalDatasetWrapper.from_file(s1.replace("vv", "vh"))
-
-            raster_vv = ds_vv.array
-            raster_vh = ds_vh.array
-            # Filtering bloc here
-
-            raster_vv[idx_reject_gswo] = 0
-            raster_vh[idx_reject_gswo] = 0
-            raster_vv[idx_reject_slp] = 0
-            raster_vh[idx_reject_slp] = 0
-            print("\t\t\tNumber of pixels used: %s/%s" %
-                  (len(np.where(raster_vv > 0)[0]), reduce(lambda x, y: x*y, list(ds_vv.array.shape))))
-
-            if len(np.where(raster_vv > 0)[0]) != 0:
-
-                raster_vv = np.float32(raster_vv)
-                raster_vh = np.float32(raster_vh)
-
-                # VV and VH array truncation
-                raster_vv[raster_vv >= 1] = 1
-                raster_vh[raster_vh >= 1] = 1
-
-                # S1 vertical Stack creation/updating
-                if not vstack_s1.any():
-                    vstack_s1 = np.vstack((raster_vv[np.unravel_index(imask_roi, mask_gswo.shape)],
-                                           raster_vh[np.unravel_index(imask_roi, mask_gswo.shape)]))
-                    vstack_s1 = np.vstack((vstack_s1, slp_norm[np.unravel_index(imask_roi, mask_gswo.shape)]))
-                else:
-                    vstack_s1_tmp = np.vstack((raster_vv[np.unravel_index(imask_roi, mask_gswo.shape)],
-                                               raster_vh[np.unravel_index(imask_roi, mask_gswo.shape)]))
-                    vstack_tmp = np.vstack(
-                        (vstack_s1_tmp, slp_norm[np.unravel_index(imask_roi, mask_gswo.shape)]))
-                    vstack_s1 = np.hstack((vstack_s1, vstack_tmp))
-
-                # Random selection stack creation/updating (on array of same size of ROI)
-                nonzero = np.flatnonzero(raster_vv[np.unravel_index(imask_rdn, mask_gswo.shape)]) * 1
-                if len(nonzero) > len(np.flatnonzero(mask_gswo)):
-                    rdn = np.random.choice(len(nonzero), size=len(np.flatnonzero(mask_gswo)), replace=False)
-                else:
-                    rdn = np.random.choice(len(nonzero), size=len(np.flatnonzero(mask_gswo)), replace=True)
-                    print("\t\t\tBeware: probably more water than ground in the image")
-                
-                if not rdn_stack.any():
-                    rdn_stack = np.vstack((raster_vv[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]],
-                                           raster_vh[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]]))
-                    rdn_stack = np.vstack((rdn_stack,
-                                           slp_norm[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]]))
-                else:
-                    rdn_stack_tmp1 = np.vstack((raster_vv[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]],
-                                                raster_vh[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]]))
-                    rdn_stack_tmp2 = np.vstack(
-                        (rdn_stack_tmp1, slp_norm[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]]))
-                    rdn_stack = np.hstack((rdn_stack, rdn_stack_tmp2))
-                    
-    return vstack_s1, rdn_stack
-
-
-def s2_prep_stack_builder(s2files, idx_reject_gswo,  mask_gswo, imask_roi, imask_rdn, vstack_s2, rdn_stack):
-    """
-    S2 parsing and processing (MNDWI & NDVI) with GSWO (water proof)
-
-    :param s2files: S2 file list
-    :param idx_reject_gswo: Rejected GSWO mask values
-    :param mask_gswo: Selected pixels (water pixels at >90% occurrence)
-    :param imask_roi: index map of ROI
-    :param imask_rdn: index of random pixels (random non-water)
-    :param vstack_s2: Input S2 Water stack
-    :param rdn_stack: Input S2 rdn stack
-    :return: Output S2 Water and rdn_stack stacks
-    """
-
-    for j, s2 in enumerate(s2files):
-
-        prod = Product.MajaProduct.factory(s2)
-        print(prod)
-        # MNDWI and NDVI file loading:
-        ds_mndwi = gdal_warp(prod.get_synthetic_band("mndwi"), tr="10 10", r="cubic")
-        ds_ndvi = gdal_warp(prod.get_synthetic_band("ndvi"), tr="10 10", r="cubic")
-        mndwi = ds_mndwi.array
-        ndvi = ds_ndvi.array
-
-        scl_path = prod.find_file(pattern=r"\w+SCL_20m.jp2$", depth=5)[0]
-        scl_img = gdal_warp(scl_path, 
-                            tr="10 10", 
-                            r="cubic").array
-        
-        # No-data field
-        outfield = np.where(scl_img == 0)
-        mndwi[outfield] = -10000
-        ndvi[outfield] = -10000
-
-        # Get cloud, cloud shadow and snow layers
-        cld_shadow = np.where(scl_img == 3)
-        cld = np.where((scl_img >= 8) & (scl_img <= 10))
-
-        # Apply nodata for all pixels classified as no-data/cloud/cloud-shadow:
-        mndwi[idx_reject_gswo] = -10000
-        ndvi[idx_reject_gswo] = -10000
-        mndwi[cld_shadow] = -10000
-        mndwi[cld] = -10000
-        ndvi[cld_shadow] = -10000
-        ndvi[cld] = -10000
-
-        nonzeroroi = np.flatnonzero(ndvi[np.unravel_index(imask_roi, mask_gswo.shape)] != -10000) * 1
-        nonzero = np.flatnonzero(ndvi[np.unravel_index(imask_rdn, mask_gswo.shape)] != -10000) * 1
-        if (len(np.where(ndvi > -10000)[0]) != 0) & (len(nonzero) != 0):
-            ndvi = ndvi / 5000
-            mndwi = mndwi / 5000
-
-            # Final
-            if not vstack_s2.any():
-                vstack_s2 = np.vstack((ndvi[np.unravel_index(imask_roi, mask_gswo.shape)][nonzeroroi],
-                                        mndwi[np.unravel_index(imask_roi, mask_gswo.shape)][nonzeroroi]))
-
-            else:
-                vstack_s2_tmp = np.vstack((ndvi[np.unravel_index(imask_roi, mask_gswo.shape)][nonzeroroi],
-                                           mndwi[np.unravel_index(imask_roi, mask_gswo.shape)][nonzeroroi]))
-                vstack_s2 = np.hstack((vstack_s2, vstack_s2_tmp))
-
-            if len(nonzero) > len(np.flatnonzero(mask_gswo)):
-                rdn = np.random.choice(len(nonzero), size=len(np.flatnonzero(mask_gswo)), replace=False)
-            else:
-                rdn = np.random.choice(len(nonzero), size=len(np.flatnonzero(mask_gswo)), replace=True)
-                print("\t\t\tBeware: probably more water than ground in the image")
-
-            if not rdn_stack.any():
-                rdn_stack = np.vstack((ndvi[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]],
-                                     mndwi[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]]))
-            else:
-                rdn_stack_tmp1 = np.vstack((ndvi[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]],
-                                            mndwi[np.unravel_index(imask_rdn, mask_gswo.shape)][nonzero[rdn]]))
-                rdn_stack = np.hstack((rdn_stack, rdn_stack_tmp1))
-
-    return vstack_s2, rdn_stack
-
-
-def slope_creator(tmpdir, epsg, extent_str, topo_names, res=10):
-    """
-    :param tmpdir: temporary folder
-    :param epsg: epsg tile number
-    :param extent_str: tile extent
-    :param topo_names: DEM filenames from which SLP calculation will be made
-    :return: normalized slope tile & index of pixels to be rejected
-    """
-    # Conversion to float32 format
-    tmpvrt = os.path.join(tmpdir, "Temp_slp_vrt.vrt")
-    tmpwarp = os.path.join(tmpdir, "Temp_slp_32.tif")
-    tmpslope = os.path.join(tmpdir, "Temp_slope.tif")
-
-    gdal_buildvrt(*topo_names, dst=tmpvrt)
-    gdal_warp(tmpvrt, 
-              tmpwarp, 
-              s_srs="EPSG:4326", 
-              t_srs="EPSG:%s" % epsg, 
-              te=extent_str)
-
-    # Slope formation
-    os.system("gdaldem slope -q -of GTiff %s %s" % (tmpwarp, tmpslope))
-
-    # Slope formatting (crop and resampling)
-    ds_final = gdal_warp(tmpslope, 
-                         t_srs="EPSG:%s" % epsg, 
-                         tr="%s %s" % (res[0], res[1]),
-                         te=extent_str, 
-                         r="bilinear", 
-                         ot="Float32")
-
-    slp = ds_final.array
-    slp_norm = slp / 90  # Normalization
-    idx_reject_slp = np.where(slp < 0)  # index to reject
-
-    return slp_norm, idx_reject_slp
-
-
-def gsw_cutter(tmpdir, epsg, extent, gsw_filesnames, res=[10, 10]):
-    """
-    :param tmpdir: temporary folder
-    :param epsg: epsg tile number
-    :param ul: Upper left coordinate (lat, lon) of the site expressed in WGS-84 (EPSG 4326)
-    :param lr: Lower right coordinate (lat, lon) of the site expressed in WGS-84 (EPSG 4326)
-    :param topo_names: DEM filenames from which SLP calculation will be made
-    :return: normalized slope tile & index of pixels to be rejected
-    """
-    # Conversion to float32 format
-    tmpvrt = os.path.join(tmpdir, "Temp_gsw_vrt.vrt")
-    tmpwarp = os.path.join(tmpdir, "Temp_gsw_32.tif")
-
-    gdal_buildvrt(*gsw_filesnames, dst=tmpvrt)
-
-    gdal_warp(tmpvrt, 
-              tmpwarp, 
-              s_srs="EPSG:4326", 
-              t_srs="EPSG:%s" % epsg, 
-              te="{} {} {} {}".format(extent[0], extent[2], extent[1], extent[3])) #xmin, ymin, xmax, ymax
-
-    ds_final = gdal_warp(tmpwarp, 
-                         t_srs="EPSG:%s" % epsg, 
-                         tr="%s %s" % (res[0], res[1]),
-                         te="{} {} {} {}".format(extent[0], extent[2], extent[1], extent[3]), #xmin, ymin, xmax, ymax
-                         r="nearest")
-    return ds_final
-
-
-def lee_filter(img, size):
-    """
-    :param img: Image array to be filtered
-    :param size: Size of the filter box (must be odd number)
-    :return: filtered array
-    """
-    img_mean = uniform_filter(img, (size, size))
-    img_sqr_mean = uniform_filter(img**2, (size, size))
-    img_variance = img_sqr_mean - img_mean**2
-
-    overall_variance = variance(img)
-
-    img_weights = img_variance / (img_variance + overall_variance)
-    img_output = img_mean + img_weights*(img - img_mean)
-    return img_output
-
-
-def s1_inf_stack_builder(filename, slp_norm):
-    """
-    Stack builder for Sentinel-1 files for inference purposes
-    :param filename:  Sentinel-1 path and filename for inference
-    :param slp_norm: normalized slope array from MERIT
-    :return: Stack array for inference
-    """
-
-    print("\t File on which inference will be done: ", filename)
-    name_vh = filename.replace("vv", "vh")
-    assert os.path.exists(name_vh), "Cannot find VH Image: %s" % name_vh
-    ds_vv = GDalDatasetWrapper.from_file(filename)
-    ds_vh = GDalDatasetWrapper.from_file(filename.replace("vv", "vh"))
-
-    s1_vv = np.array(ds_vv.array, dtype=np.float32)
-    s1_vh = np.array(ds_vh.array, dtype=np.float32)
-    s1_vv[s1_vv == 0] = np.nan
-    s1_vh[s1_vh == 0] = np.nan
-
-    stacked = np.hstack((np.reshape(s1_vv, (-1, 1)), np.reshape(s1_vh, (-1, 1))))
-    vstack = np.hstack((stacked, np.reshape(slp_norm, (-1, 1))))
-    return vstack
-
-
-def tsx_inf_stack_builder(filename, slp_norm, C=2500):
-    """
-    Stack builder for Sentinel-1 files for inference purposes
-    :param filename:  Sentinel-1 path and filename for inference
-    :param slp_norm: normalized slope array from MERIT
-    :param C: empirical value to try to calibrate the value to the propper sigma0
-    :return: Stack array for inference
-    """
-
-    print("\t File on which inference will be done: ", filename)
-    ds = GDalDatasetWrapper.from_file(filename)
-
-    tsx = np.array(ds.array/C, dtype=np.float32) 
-    tsx[tsx == 0] = np.nan
-    vstack = np.hstack((np.reshape(tsx, (-1, 1)), np.reshape(slp_norm, (-1, 1))))
-    return vstack
-
-
-def s2_inf_stack_builder(product, tmpdir):
-
-    """
-    Stack builder for Sentinel-2 files for inference purposes
-
-    :param product:  Sentinel-2 L2A product
-    :param tmpdir: Temporary working directory to write synthetic bands to.
-    :return: Stack array for inference
-    """
-
-    # MNDWI and NDVI file loading:
-    ds_mndwi = gdal_warp(product.get_synthetic_band("mndwi", wdir=tmpdir), 
-                        tr="10 10", 
-                        r="cubic")
-    ds_ndvi = gdal_warp(product.get_synthetic_band("ndvi", wdir=tmpdir), 
-                        tr="10 10", 
-                        r="cubic")
-    mndwi = ds_mndwi.array
-    ndvi = ds_ndvi.array
-
-    mndwi = mndwi / 5000
-    ndvi = ndvi / 5000
-
-    mndwi[mndwi == -2] = np.nan
-    ndvi[ndvi == -2] = np.nan
-
-    vstack_add = np.hstack((np.reshape(ndvi, (-1, 1)), np.reshape(mndwi, (-1, 1))))
-
-    vstack_s2 = vstack_add
-    gc.collect()
-    return vstack_s2
-
-
-def ldt_inf_stack_builder(product, tmpdir):
-
-    """
-    Stack builder for Landsat8/9 files for inference purposes
-
-    :param product:  Landsat8 L2SP product
-    :param tmpdir: Temporary working directory to write synthetic bands to.
-    :return: Stack array for inference
-    """
-
-    # MNDWI and NDVI file loading:
-    ds_mndwi = gdal_warp(product.get_synthetic_band("mndwi", wdir=tmpdir), 
-                         tr="30 30", 
-                         r="cubic")
-    ds_ndvi = gdal_warp(product.get_synthetic_band("ndvi", wdir=tmpdir), 
-                        tr="30 30", 
-                        r="cubic")
-
-    mndwi = ds_mndwi.array
-    ndvi = ds_ndvi.array
-
-    mndwi = mndwi / 5000
-    ndvi = ndvi / 5000
-
-    mndwi[mndwi == -2] = np.nan
-    ndvi[ndvi == -2] = np.nan
-
-    vstack_add = np.hstack((np.reshape(ndvi, (-1, 1)), np.reshape(mndwi, (-1, 1))))
-
-    vstack_l8 = vstack_add
-    gc.collect()
-    return vstack_l8
-
-
-def postreatment(inmat, radius=2):
-    """
-    Post-treatment to be applied to the output of the raw inference.
-
-    :param inmat:  numpy array of the raw inference
-    :param radius: radius of the majority filter to be applied. Default is 2
-    :return: Stack array for inference
-    """
-
-    filtered = majority(inmat, disk(radius))
-    return filtered
-
-
-def wc_classifier(tmpdir, epsg, extent, wc_files, res=[10, 10]):
-    """
-    :param tmpdir: temporary folder
-    :param epsg: epsg tile number
-    :param extent: tile extent [xmin, ymin, xmax, ymax]
-    :param topo_names: DEM filenames from which SLP calculation will be made
-    :return: normalized slope tile & index of pixels to be rejected
-    """
-    # Conversion to float32 format
-    tmpvrt = os.path.join(tmpdir, "Temp_wc_vrt.vrt")
-    tmpwarp = os.path.join(tmpdir, "Temp_wc_32.tif")
-    tmpwc = os.path.join(tmpdir, "Temp_wc.tif")
-
-    gdal_buildvrt(*wc_files, dst=tmpvrt)
-    gdal_warp(tmpvrt, 
-              tmpwarp, 
-              s_srs="EPSG:4326", 
-              t_srs="EPSG:%s" % epsg, 
-              te="{} {} {} {}".format(extent[0], extent[1], extent[2], extent[3])) #xmin, ymin, xmax, ymax
-
-
-    ds_final = gdal_warp(tmpwarp, 
-                         tmpwc, 
-                         t_srs="EPSG:%s" % epsg, 
-                         tr="%s %s" % (res[0], res[1]),
-                         te="{} {} {} {}".format(extent[0], extent[1], extent[2], extent[3]), #xmin, ymin, xmax, ymax
-                         r="nearest", 
-                         ot="Float32")
-
-    wc_array = ds_final.array
-
-    return wc_array
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+import numpy as np
+import os
+import gc
+from scipy.ndimage.filters import uniform_filter
+from scipy.ndimage.measurements import variance
+from functools import partial
+from Common.GDalDatasetWrapper import GDalDatasetWrapper
+from Common.ImageTools import gdal_warp, gdal_buildvrt
+from Common.WindowedInference import open_warped, read_window, iter_windows
+from Common import AuxiliaryLayers
+from Common import FileSystem
+from Common import ImageIO
+from Common import ImageTools
+from Common import PostProcessing
+from Common.TrainingSamples import acquisition_date
+from Chain import Product
+from skimage.morphology import disk, ball
+import matplotlib.pyplot as plt
+            
+s2_bands = ["B01", "B02", "B03", "B04", "B05", "B06", "B07", "B08", "B8A", "B09", "B11", "B12", "SCL"]
+
+# Sen2cor SCL codes to inference classes. 0 keeps the predicted class.
+SCL_LUT = np.zeros(256, dtype=np.uint8)
+SCL_LUT[0] = 255  # No data
+SCL_LUT[3] = 7  # Cloud shadow
+SCL_LUT[[8, 9, 10]] = 6  # Cloud (medium & high probability, thin cirrus)
+
+
+def s1_prep_stack_builder(s1_vv, slp_norm, idx_reject_slp, plan, vstack_s1, rdn_stack):
+    """
+    S1 parsing and processing (VV & VH) with GSWO (water ground truth) and MERIT (slope)
+
+    :param s1_vv: S1 file list
+    :param slp_norm: Normalized slope array
+    :param idx_reject_slp: Rejected MERIT slope values
+    :param plan: The :class:`Common.TrainingSamples.SamplingPlan` of the tile
+    :param vstack_s1: S1 Water samples as :class:`Common.TrainingSamples.FeatureBuffer`
+    :param rdn_stack: S1 rdn samples as :class:`Common.TrainingSamples.FeatureBuffer`
+    :return: S1 Water and rdn_stack buffers, of layout (samples, features)
+    """
+
+    for j, s1 in enumerate(s1_vv):
+
+        print("\t", s1)
+
+        name_vh = s1.replace("vv", "vh")
+        if os.path.exists(name_vh):
+            print("\t", name_vh)
+
+            # VV and VH array loading
+            ds_vv = GDalDatasetWrapper.from_file(s1)
+            ds_vh = GDalDatasetWrapper.from_file(s1.replace("vv", "vh"))
+
+            raster_vv = ds_vv.array
+            raster_vh = ds_vh.array
+            # Filtering bloc here
+
+            np.put(raster_vv, plan.reject, 0)
+            np.put(raster_vh, plan.reject, 0)
+            raster_vv[idx_reject_slp] = 0
+            raster_vh[idx_reject_slp] = 0
+            n_valid = np.count_nonzero(raster_vv > 0)
+            print("\t\t\tNumber of pixels used: %s/%s" % (n_valid, raster_vv.size))
+
+            if n_valid != 0:
+
+                raster_vv = np.float32(raster_vv)
+                raster_vh = np.float32(raster_vh)
+
+                # VV and VH array truncation
+                raster_vv[raster_vv >= 1] = 1
+                raster_vh[raster_vh >= 1] = 1
+
+                # S1 Water samples
+                date = acquisition_date(s1)
+                vstack_s1.append(plan.gather(plan.roi, raster_vv, raster_vh, slp_norm), date=date)
+
+                # Random selection (on array of same size of ROI)
+                nonzero = plan.rdn[np.flatnonzero(np.take(raster_vv, plan.rdn))]
+                rdn_stack.append(plan.gather(plan.draw_random(nonzero), raster_vv, raster_vh, slp_norm), date=date)
+
+    return vstack_s1, rdn_stack
+
+
+def s2_prep_stack_builder(s2files, plan, vstack_s2, rdn_stack):
+    """
+    S2 parsing and processing (MNDWI & NDVI) with GSWO (water proof)
+
+    :param s2files: S2 file list
+    :param plan: The :class:`Common.TrainingSamples.SamplingPlan` of the tile
+    :param vstack_s2: S2 Water samples as :class:`Common.TrainingSamples.FeatureBuffer`
+    :param rdn_stack: S2 rdn samples as :class:`Common.TrainingSamples.FeatureBuffer`
+    :return: Output S2 Water and rdn_stack buffers, of layout (samples, features)
+    """
+
+    for j, s2 in enumerate(s2files):
+
+        prod = Product.MajaProduct.factory(s2)
+        print(prod)
+        # MNDWI and NDVI file loading:
+        ds_mndwi = gdal_warp(prod.get_synthetic_band("mndwi"), tr="10 10", r="cubic")
+        ds_ndvi = gdal_warp(prod.get_synthetic_band("ndvi"), tr="10 10", r="cubic")
+        mndwi = ds_mndwi.array
+        ndvi = ds_ndvi.array
+
+        scl_path = prod.find_file(pattern=r"\w+SCL_20m.jp2$", depth=5)[0]
+        scl_img = gdal_warp(scl_path, 
+                            tr="10 10", 
+                            r="cubic").array
+
+        # Apply nodata for all pixels classified as no-data/cloud/cloud-shadow:
+        invalid = (scl_img == 0) | (scl_img == 3) | ((scl_img >= 8) & (scl_img <= 10))
+        np.put(invalid, plan.reject, True)
+        mndwi[invalid] = -10000
+        ndvi[invalid] = -10000
+
+        nonzeroroi = plan.roi[np.flatnonzero(np.take(ndvi, plan.roi) != -10000)]
+        nonzero = plan.rdn[np.flatnonzero(np.take(ndvi, plan.rdn) != -10000)]
+        if np.any(ndvi > -10000) & (len(nonzero) != 0):
+            # Final
+            date = int(prod.date.strftime("%Y%m%d"))
+            vstack_s2.append(plan.gather(nonzeroroi, ndvi, mndwi) / 5000, date=date)
+            rdn_stack.append(plan.gather(plan.draw_random(nonzero), ndvi, mndwi) / 5000, date=date)
+
+    return vstack_s2, rdn_stack
+
+
+def slope_creator(tmpdir, epsg, extent_str, topo_names, res=[10, 10], layers=None):
+    """
+    :param tmpdir: temporary folder. Unused, the slope is computed in memory.
+    :param epsg: epsg tile number
+    :param extent_str: tile extent
+    :param topo_names: DEM filenames from which SLP calculation will be made
+    :param res: output resolution (x, y)
+    :param layers: The :class:`Common.AuxiliaryLayers.AuxiliaryLayers` service caching the slopes.
+    Default is the process-wide service.
+    :return: normalized slope tile & index of pixels to be rejected
+    """
+    layers = layers or AuxiliaryLayers.get_default()
+    ds_final = layers.slope(topo_names, epsg, extent_str, res)
+
+    slp = ds_final.array
+    slp_norm = slp / 90  # Normalization
+    idx_reject_slp = np.where(slp < 0)  # index to reject
+
+    return slp_norm, idx_reject_slp
+
+
+def slope_source(epsg, extent_str, topo_names, res=[10, 10], layers=None):
+    """
+    Slope window source for the streaming inference, normalized window by window. See :func:`slope_norm_window`.
+
+    :param epsg: epsg tile number
+    :param extent_str: tile extent
+    :param topo_names: DEM filenames from which SLP calculation will be made
+    :param res: output resolution (x, y)
+    :param layers: The :class:`Common.AuxiliaryLayers.AuxiliaryLayers` service caching the slopes.
+    Default is the process-wide service.
+    :return: The slope in degrees, as (read-only) :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper`
+    """
+    layers = layers or AuxiliaryLayers.get_default()
+    return layers.slope(topo_names, epsg, extent_str, res)
+
+
+def slope_norm_window(slp):
+    """
+    Normalize a window of the slope, as :func:`slope_creator`.
+    To avoid planar over detection, slp=0 and nodata values are set to 0.01.
+
+    :param slp: The slope window in degrees
+    :return: The normalized slope window, as float32
+    """
+    slp_norm = (slp / 90).astype(np.float32)
+    slp_norm[slp_norm <= 0] = 0.01
+    return slp_norm
+
+
+def gsw_cutter(tmpdir, epsg, extent, gsw_filesnames, res=[10, 10], layers=None):
+    """
+    :param tmpdir: temporary folder. Unused, the layer is computed in memory.
+    :param epsg: epsg tile number
+    :param extent: tile extent [xmin, xmax, ymin, ymax]
+    :param gsw_filesnames: GSW occurrence filenames covering the tile
+    :param res: output resolution (x, y)
+    :param layers: The :class:`Common.AuxiliaryLayers.AuxiliaryLayers` service caching the layers.
+    Default is the process-wide service.
+    :return: GSW occurrence dataset on the tile grid
+    """
+    layers = layers or AuxiliaryLayers.get_default()
+    return layers.get("gsw", 
+                      gsw_filesnames, 
+                      epsg, 
+                      (extent[0], extent[2], extent[1], extent[3]),  # xmin, ymin, xmax, ymax
+                      res, 
+                      r="nearest")
+
+
+def lee_filter(img, size):
+    """
+    :param img: Image array to be filtered
+    :param size: Size of the filter box (must be odd number)
+    :return: filtered array
+    """
+    img_mean = uniform_filter(img, (size, size))
+    img_sqr_mean = uniform_filter(img**2, (size, size))
+    img_variance = img_sqr_mean - img_mean**2
+
+    overall_variance = variance(img)
+
+    img_weights = img_variance / (img_variance + overall_variance)
+    img_output = img_mean + img_weights*(img - img_mean)
+    return img_output
+
+
+def s1_inf_features(vv, vh, slp_norm):
+    """
+    Feature builder for Sentinel-1 images or image windows for inference purposes
+
+    :param vv: The VV array
+    :param vh: The VH array
+    :param slp_norm: The normalized slope array of the same size
+    :return: Stack array (n_pixels, 3) for inference
+    """
+    vstack = np.empty((vv.size, 3), dtype=np.float32)
+    vstack[:, 0] = vv.ravel()
+    vstack[:, 1] = vh.ravel()
+    vstack[:, 2] = slp_norm.ravel()
+    vstack[vstack[:, 0] == 0, 0] = np.nan
+    vstack[vstack[:, 1] == 0, 1] = np.nan
+    return vstack
+
+
+def tsx_inf_features(tsx, slp_norm, C=2500):
+    """
+    Feature builder for TerraSAR-X images or image windows for inference purposes
+
+    :param tsx: The TSX array
+    :param slp_norm: The normalized slope array of the same size
+    :param C: empirical value to try to calibrate the value to the propper sigma0
+    :return: Stack array (n_pixels, 2) for inference
+    """
+    vstack = np.empty((tsx.size, 2), dtype=np.float32)
+    vstack[:, 0] = tsx.ravel() / C
+    vstack[:, 1] = slp_norm.ravel()
+    vstack[vstack[:, 0] == 0, 0] = np.nan
+    return vstack
+
+
+def ndvi_mndwi_inf_features(ndvi, mndwi):
+    """
+    Feature builder for optical (Sentinel-2, Landsat8/9) images or image windows for inference purposes
+
+    :param ndvi: The NDVI array, scaled by 5000
+    :param mndwi: The MNDWI array, scaled by 5000
+    :return: Stack array (n_pixels, 2) for inference
+    """
+    ndvi = ndvi.ravel() / 5000
+    mndwi = mndwi.ravel() / 5000
+    vstack = np.empty((ndvi.size, 2), dtype=np.float32)
+    vstack[:, 0] = np.where(ndvi == -2, np.nan, ndvi)
+    vstack[:, 1] = np.where(mndwi == -2, np.nan, mndwi)
+    return vstack
+
+
+def s1_inf_stack_builder(filename, slp_norm):
+    """
+    Stack builder for Sentinel-1 files for inference purposes
+    :param filename:  Sentinel-1 path and filename for inference
+    :param slp_norm: normalized slope array from MERIT
+    :return: Stack array for inference
+    """
+
+    print("\t File on which inference will be done: ", filename)
+    name_vh = filename.replace("vv", "vh")
+    assert os.path.exists(name_vh), "Cannot find VH Image: %s" % name_vh
+    ds_vv = GDalDatasetWrapper.from_file(filename)
+    ds_vh = GDalDatasetWrapper.from_file(name_vh)
+    return s1_inf_features(ds_vv.array, ds_vh.array, slp_norm)
+
+
+def s1_inf_window_features(vv, vh, slp):
+    """
+    Feature builder for Sentinel-1 image windows, normalizing the slope of the window
+
+    :param vv: The VV window
+    :param vh: The VH window
+    :param slp: The slope window in degrees, see :func:`slope_source`
+    :return: Stack array (n_pixels, 3) for inference
+    """
+    return s1_inf_features(vv, vh, slope_norm_window(slp))
+
+
+def s1_inf_sources(filename, slope):
+    """
+    Window sources for the streaming inference of Sentinel-1 files.
+    See :func:`Common.WindowedInference.stream_predict`.
+
+    :param filename:  Sentinel-1 path and filename for inference
+    :param slope: slope source from MERIT, see :func:`slope_source`
+    :return: The list of sources and the function building the features of a window
+    """
+    print("\t File on which inference will be done: ", filename)
+    name_vh = filename.replace("vv", "vh")
+    assert os.path.exists(name_vh), "Cannot find VH Image: %s" % name_vh
+    sources = [ImageIO.open_tiff(filename), ImageIO.open_tiff(name_vh), slope]
+    return sources, s1_inf_window_features
+
+
+def tsx_inf_stack_builder(filename, slp_norm, C=2500):
+    """
+    Stack builder for Sentinel-1 files for inference purposes
+    :param filename:  Sentinel-1 path and filename for inference
+    :param slp_norm: normalized slope array from MERIT
+    :param C: empirical value to try to calibrate the value to the propper sigma0
+    :return: Stack array for inference
+    """
+
+    print("\t File on which inference will be done: ", filename)
+    ds = GDalDatasetWrapper.from_file(filename)
+    return tsx_inf_features(ds.array, slp_norm, C=C)
+
+
+def tsx_inf_window_features(tsx, slp, C=2500):
+    """
+    Feature builder for TerraSAR-X image windows, normalizing the slope of the window
+
+    :param tsx: The TSX window
+    :param slp: The slope window in degrees, see :func:`slope_source`
+    :param C: empirical value to try to calibrate the value to the propper sigma0
+    :return: Stack array (n_pixels, 2) for inference
+    """
+    return tsx_inf_features(tsx, slope_norm_window(slp), C=C)
+
+
+def tsx_inf_sources(filename, slope, C=2500):
+    """
+    Window sources for the streaming inference of TerraSAR-X files.
+    See :func:`Common.WindowedInference.stream_predict`.
+
+    :param filename:  TSX path and filename for inference
+    :param slope: slope source, see :func:`slope_source`
+    :param C: empirical value to try to calibrate the value to the propper sigma0
+    :return: The list of sources and the function building the features of a window
+    """
+    print("\t File on which inference will be done: ", filename)
+    sources = [ImageIO.open_tiff(filename), slope]
+    return sources, partial(tsx_inf_window_features, C=C)
+
+
+def s2_inf_stack_builder(product, tmpdir):
+
+    """
+    Stack builder for Sentinel-2 files for inference purposes
+
+    :param product:  Sentinel-2 L2A product
+    :param tmpdir: Temporary working directory to write synthetic bands to.
+    :return: Stack array for inference
+    """
+
+    # MNDWI and NDVI file loading:
+    ds_mndwi = gdal_warp(product.get_synthetic_band("mndwi", wdir=tmpdir), 
+                        tr="10 10", 
+                        r="cubic")
+    ds_ndvi = gdal_warp(product.get_synthetic_band("ndvi", wdir=tmpdir), 
+                        tr="10 10", 
+                        r="cubic")
+    vstack_s2 = ndvi_mndwi_inf_features(ds_ndvi.array, ds_mndwi.array)
+    gc.collect()
+    return vstack_s2
+
+
+def s2_inf_sources(product, tmpdir):
+    """
+    Window sources for the streaming inference of Sentinel-2 files.
+    The synthetic bands are resampled on the fly for each window.
+    See :func:`Common.WindowedInference.stream_predict`.
+
+    :param product:  Sentinel-2 L2A product
+    :param tmpdir: Temporary working directory to write synthetic bands to.
+    :return: The list of sources and the function building the features of a window
+    """
+    sources = [open_warped(product.get_synthetic_band("ndvi", wdir=tmpdir), tr="10 10", r="cubic"),
+               open_warped(product.get_synthetic_band("mndwi", wdir=tmpdir), tr="10 10", r="cubic")]
+    return sources, ndvi_mndwi_inf_features
+
+
+def ldt_inf_stack_builder(product, tmpdir):
+
+    """
+    Stack builder for Landsat8/9 files for inference purposes
+
+    :param product:  Landsat8 L2SP product
+    :param tmpdir: Temporary working directory to write synthetic bands to.
+    :return: Stack array for inference
+    """
+
+    # MNDWI and NDVI file loading:
+    ds_mndwi = gdal_warp(product.get_synthetic_band("mndwi", wdir=tmpdir), 
+                         tr="30 30", 
+                         r="cubic")
+    ds_ndvi = gdal_warp(product.get_synthetic_band("ndvi", wdir=tmpdir), 
+                        tr="30 30", 
+                        r="cubic")
+    vstack_l8 = ndvi_mndwi_inf_features(ds_ndvi.array, ds_mndwi.array)
+    gc.collect()
+    return vstack_l8
+
+
+def ldt_inf_sources(product, tmpdir):
+    """
+    Window sources for the streaming inference of Landsat8/9 files.
+    The synthetic bands are resampled on the fly for each window.
+    See :func:`Common.WindowedInference.stream_predict`.
+
+    :param product:  Landsat8 L2SP product
+    :param tmpdir: Temporary working directory to write synthetic bands to.
+    :return: The list of sources and the function building the features of a window
+    """
+    sources = [open_warped(product.get_synthetic_band("ndvi", wdir=tmpdir), tr="30 30", r="cubic"),
+               open_warped(product.get_synthetic_band("mndwi", wdir=tmpdir), tr="30 30", r="cubic")]
+    return sources, ndvi_mndwi_inf_features
+
+
+def ldt_cloud_mask(blue):
+    """
+    Cloud detection on the blue band of Landsat 8/9, as top-of-atmosphere reflectance above 0.2
+
+    :param blue: The blue band (B2) array
+    :return: The boolean cloud mask
+    """
+    return np.multiply(blue, 2.75e-5) - 0.2 > 0.2
+
+
+def scl_remap(exout, scl_img, lut=SCL_LUT):
+    """
+    Apply the Sen2cor SCL cloud, cloud shadow and nodata codes to the inference in a single pass.
+
+    :param exout: The uint8 inference array. Modified in place.
+    :param scl_img: The SCL array (nearest-neighbour resampled) of the same shape
+    :param lut: The 256-entry lookup table from SCL code to inference class. Entries set to 0 keep the inference.
+    :return: The modified inference array
+    """
+    override = lut[np.asarray(scl_img, dtype=np.uint8)]
+    np.copyto(exout, override, where=override != 0)
+    return exout
+
+
+def postreatment(inmat, radius=2, ignore=PostProcessing.DEFAULT_IGNORE, n_workers=None):
+    """
+    Post-treatment to be applied to the output of the raw inference.
+
+    :param inmat:  numpy array of the raw inference
+    :param radius: radius of the majority filter to be applied. Default is 2
+    :param ignore: labels not taking part in the vote, kept as they are. Default is nodata, clouds and shadows.
+    :param n_workers: number of tiles filtered in parallel. Default is the number of CPUs.
+    :return: Stack array for inference
+    """
+
+    filtered = PostProcessing.majority_filter(inmat, radius=radius, ignore=ignore, n_workers=n_workers)
+    return filtered
+
+
+def postreatment_stream(inband, ctx, wc, post_band, ocs_band, radius=2, ignore=PostProcessing.DEFAULT_IGNORE,
+                        n_workers=None, lines=PostProcessing.DEFAULT_TILE_SIZE):
+    """
+    Post-treatment of a raw inference written to a file, strip by strip: majority filter, nodata and OCS classes.
+    Each strip is read with a halo of the filter radius, so that the result is the same as for the whole image.
+
+    :param inband: The :class:`gdal.Band` of the raw inference
+    :param ctx: The :class:`Common.ProductContext.ProductContext` of the input image
+    :param wc: ESA WorldCover on the same grid, see :func:`wc_classifier`
+    :param post_band: The :class:`gdal.Band` the post-processed inference is written to
+    :param ocs_band: The :class:`gdal.Band` the OCS classes are written to.
+    See :func:`Common.PostProcessing.ocs_classes`
+    :param radius: radius of the majority filter to be applied. Default is 2
+    :param ignore: labels not taking part in the vote, kept as they are. Default is nodata, clouds and shadows.
+    :param n_workers: number of tiles of a strip filtered in parallel. Default is the number of CPUs.
+    :param lines: The number of lines of a strip, without its halo
+    """
+    ysize, xsize = ctx.shape
+    for _, yoff, _, win_ysize in iter_windows(xsize, ysize, lines):
+        y0, y1 = max(0, yoff - radius), min(ysize, yoff + win_ysize + radius)
+        strip = inband.ReadAsArray(0, y0, xsize, y1 - y0)
+        post = postreatment(strip, radius=radius, ignore=ignore, n_workers=n_workers)[yoff - y0:yoff - y0 + win_ysize]
+        ctx.apply_nodata(post, yoff=yoff)
+        post_band.WriteArray(post, 0, yoff)
+        ocs_band.WriteArray(PostProcessing.ocs_classes(post, read_window(wc, 0, yoff, xsize, win_ysize)), 0, yoff)
+
+
+def wc_classifier(tmpdir, epsg, extent, wc_files, res=[10, 10], layers=None):
+    """
+    :param tmpdir: temporary folder. Unused, the layer is computed in memory.
+    :param epsg: epsg tile number
+    :param extent: tile extent [xmin, ymin, xmax, ymax]
+    :param wc_files: ESA WorldCover filenames covering the tile
+    :param res: output resolution (x, y)
+    :param layers: The :class:`Common.AuxiliaryLayers.AuxiliaryLayers` service caching the layers.
+    Default is the process-wide service.
+    :return: ESA WorldCover array on the tile grid (read-only)
+    """
+    layers = layers or AuxiliaryLayers.get_default()
+    ds_final = layers.get("worldcover", 
+                          wc_files, 
+                          epsg, 
+                          extent[:4],  # xmin, ymin, xmax, ymax
+                          res, 
+                          r="nearest", 
+                          ot="Float32")
+
+    wc_array = ds_final.array
+
+    return wc_array
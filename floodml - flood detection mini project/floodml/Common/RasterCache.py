@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+import os
+import json
+import glob
+import uuid
+import hashlib
+import logging
+from Common import FileSystem
+from Common.GDalDatasetWrapper import GDalDatasetWrapper
+
+log = logging.getLogger(__name__)
+
+
+class RasterCache(object):
+    """
+    Persistent, size-bounded cache of derived rasters (e.g. slopes) on disk.
+
+    Entries are addressed by a key computed from the source files and the target grid,
+    and evicted in least-recently-used order once the cache grows beyond its maximum size.
+    """
+
+    def __init__(self, cache_dir, max_bytes=10 * 1024 ** 3):
+        """
+        Create a raster cache
+
+        :param cache_dir: The directory the cached rasters are stored in. Created if not existing.
+        :param max_bytes: The maximum size of the cache in bytes. Default is 10GB.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        FileSystem.create_directory(cache_dir)
+
+    @staticmethod
+    def make_key(files, **params):
+        """
+        Compute the key of a cache entry
+
+        :param files: The list of source files. Each file is identified by its path, size and modification time.
+        :param params: The parameters describing the derived raster, e.g. epsg, extent and resolution
+        :return: The key as hex-string
+        """
+        sources = []
+        for f in sorted(set(files)):
+            stat = os.stat(f)
+            sources.append([os.path.realpath(f), stat.st_size, stat.st_mtime_ns])
+        content = json.dumps({"files": sources, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        """
+        Get the path of a cache entry
+
+        :param key: The key of the entry
+        :return: The path to the cached raster
+        """
+        return os.path.join(self.cache_dir, "%s.tif" % key)
+
+    def get(self, key):
+        """
+        Get a cached raster
+
+        :param key: The key of the entry
+        :return: A :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper` object if existing, None if not.
+        """
+        path = self.path(key)
+        if not os.path.isfile(path):
+            return None
+        try:
+            os.utime(path, None)  # Mark as recently used
+            return GDalDatasetWrapper.from_file(path)
+        except (OSError, RuntimeError) as e:
+            log.debug("Cannot read cache entry %s: %s" % (path, e))
+            return None
+
+    def put(self, key, ds, options=None):
+        """
+        Add a raster to the cache and evict the least recently used entries if needed.
+
+        :param key: The key of the entry
+        :param ds: The :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper` object to be stored
+        :param options: GTiff creation options. Default is a tiled, DEFLATE compressed GTiff.
+        :return: The path to the cached raster
+        """
+        if options is None:
+            options = ["COMPRESS=DEFLATE", "TILED=YES"]
+        path = self.path(key)
+        # Write to a unique file first, so that concurrent processes never read a partially written entry:
+        tmp_path = os.path.join(self.cache_dir, "%s.tif.%s.tmp" % (key, uuid.uuid4().hex))
+        ds.write(tmp_path, options=options)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is smaller than its maximum size.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.tif")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(e[1] for e in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            print("\tEvicting cached raster %s" % path)
+            FileSystem.remove_file(path)
+            total -= size
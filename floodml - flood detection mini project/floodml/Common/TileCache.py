@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Local store of the XYZ basemap tiles, read before requesting the tile server.
+"""
+
+
+import io
+import os
+import math
+import sqlite3
+import argparse
+from contextlib import closing
+import numpy as np
+import cartopy.io.img_tiles as cimgt
+from urllib.request import Request, urlopen
+from PIL import Image
+
+DEFAULT_URL = "http://a.tile.openstreetmap.fr/hot/{z}/{x}/{y}.png"
+
+
+class CachedTiles(cimgt.GoogleTiles):
+    """
+    XYZ tiles read from a local store first, and only requested from the server if missing.
+
+    The store is either a folder of {z}/{x}/{y}.png files or a single MBTiles (SQLite) file,
+    depending on the extension of its path. In offline mode, missing tiles are left blank.
+    """
+
+    def __init__(self, store=None, offline=False, url=DEFAULT_URL, timeout=10, **kwargs):
+        """
+        Create a tile source
+
+        :param store: The tile store: a folder, or a file ending with '.mbtiles'. Default is no store.
+        :param offline: Never request the server. Default is False.
+        :param url: The url template of the tile server
+        :param timeout: The timeout of a request in seconds
+        """
+        super(CachedTiles, self).__init__(url=url, **kwargs)
+        # Not named cache, which is used by cartopy for its own cache
+        self.store = store
+        self.offline = offline
+        self.timeout = timeout
+        if store and self._is_mbtiles:
+            with self._connect() as db, db:
+                db.execute("CREATE TABLE IF NOT EXISTS metadata (name text, value text)")
+                db.execute("CREATE TABLE IF NOT EXISTS tiles (zoom_level integer, tile_column integer, "
+                           "tile_row integer, tile_data blob)")
+                db.execute("CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row)")
+        elif store:
+            os.makedirs(store, exist_ok=True)
+
+    @property
+    def _is_mbtiles(self):
+        return os.path.splitext(self.store)[1].lower() == ".mbtiles"
+
+    def _connect(self):
+        """
+        Open the MBTiles store. The connection is closed when leaving the ``with`` block,
+        whereas the transaction is committed by a nested ``with`` on the connection.
+
+        :return: The connection, as context manager
+        """
+        return closing(sqlite3.connect(self.store))
+
+    def _tile_path(self, tile):
+        x, y, z = tile
+        return os.path.join(self.store, str(z), str(x), "%s.png" % y)
+
+    def read(self, tile):
+        """
+        Read a tile from the store
+
+        :param tile: The (x, y, z) tile
+        :return: The encoded image. None if not in the store.
+        """
+        if not self.store:
+            return None
+        x, y, z = tile
+        if self._is_mbtiles:
+            with self._connect() as db:
+                # MBTiles rows are numbered from the south (TMS)
+                row = db.execute("SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                                 (z, x, (1 << z) - 1 - y)).fetchone()
+            return bytes(row[0]) if row else None
+        path = self._tile_path(tile)
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def write(self, tile, data):
+        """
+        Write a tile to the store
+
+        :param tile: The (x, y, z) tile
+        :param data: The encoded image
+        """
+        if not self.store:
+            return
+        x, y, z = tile
+        if self._is_mbtiles:
+            with self._connect() as db, db:
+                db.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (z, x, (1 << z) - 1 - y,
+                                                                              sqlite3.Binary(data)))
+            return
+        path = self._tile_path(tile)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    def fetch(self, tile):
+        """
+        Get a tile from the store, or from the server if missing and online. Fetched tiles are stored.
+
+        :param tile: The (x, y, z) tile
+        :return: The encoded image. None if not available.
+        """
+        data = self.read(tile)
+        if data is not None or self.offline:
+            return data
+        try:
+            request = Request(self._image_url(tile), headers={"User-Agent": getattr(self, "user_agent", "FloodML")})
+            with urlopen(request, timeout=self.timeout) as fh:
+                data = fh.read()
+        except Exception as err:
+            print("Cannot get tile %s: %s" % (str(tile), err))
+            return None
+        self.write(tile, data)
+        return data
+
+    def get_image(self, tile):
+        """
+        See :func:`cartopy.io.img_tiles.GoogleWTS.get_image`. Missing tiles are blank.
+        """
+        data = self.fetch(tile)
+        if data is None:
+            img = Image.fromarray(np.full((256, 256, 3), (250, 250, 250), dtype=np.uint8))
+        else:
+            img = Image.open(io.BytesIO(data))
+        img = img.convert(self.desired_tile_form)
+        return img, self.tileextent(tile), "lower"
+
+    def prefetch(self, extent, zooms):
+        """
+        Store all tiles covering an area of interest, e.g. before processing offline
+
+        :param extent: The area as [lonmin, latmin, lonmax, latmax] in degrees
+        :param zooms: The zoom levels
+        :return: The number of tiles available in the store
+        """
+        n_tiles = 0
+        for z in zooms:
+            x0, y0 = lonlat_to_tile(extent[0], extent[3], z)
+            x1, y1 = lonlat_to_tile(extent[2], extent[1], z)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    n_tiles += self.fetch((x, y, z)) is not None
+        return n_tiles
+
+
+def lonlat_to_tile(lon, lat, z):
+    """
+    Get the XYZ tile containing a point
+
+    :param lon: The longitude in degrees
+    :param lat: The latitude in degrees, clipped to the Web-Mercator limits
+    :param z: The zoom level
+    :return: The (x, y) tile indices
+    """
+    n = 1 << z
+    lat = math.radians(max(-85.0511, min(85.0511, lat)))
+    x = int((lon + 180.) / 360. * n)
+    y = int((1. - math.asinh(math.tan(lat)) / math.pi) / 2. * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Basemap tile prefetching for offline rapid mapping')
+
+    parser.add_argument('-c', '--cache', help='Tile store: folder or .mbtiles file', type=str, required=True)
+    parser.add_argument('-e', '--extent', help='Area of interest: lonmin latmin lonmax latmax', type=float,
+                        nargs=4, required=True)
+    parser.add_argument('-z', '--zooms', help='Zoom levels', type=int, nargs='+', required=False, default=[11])
+    parser.add_argument('--url', help='Url template of the tile server', type=str, required=False,
+                        default=DEFAULT_URL)
+    arg = parser.parse_args()
+
+    print("Tiles available: %s" % CachedTiles(store=arg.cache, url=arg.url).prefetch(arg.extent, arg.zooms))
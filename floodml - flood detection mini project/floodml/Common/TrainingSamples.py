@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Accumulation of the training samples extracted from each acquisition.
+"""
+
+
+import os
+import re
+import numpy as np
+
+# Number of rows read at once from the memory-mapped samples
+CHUNK_ROWS = 1 << 20
+
+
+def acquisition_date(filename):
+    """
+    Get the acquisition date from a filename, e.g. 's1a_..._20200101t060000_...tif'
+
+    :param filename: The filename
+    :return: The date as YYYYMMDD integer. 0 if no date is found.
+    """
+    match = re.search(r"((?:19|20)\d{6})", os.path.basename(filename))
+    return int(match.group(1)) if match else 0
+
+
+class FeatureBuffer(object):
+    """
+    Append-only buffer of training samples of layout (samples, features).
+
+    The samples of each acquisition are kept as a separate chunk, so that appending does not copy
+    the samples gathered so far. The chunks are concatenated once, when the array is requested.
+    """
+
+    def __init__(self, n_features=None):
+        """
+        Create an empty feature buffer
+
+        :param n_features: The number of features per sample. Default is the one of the first chunk.
+        """
+        self.n_features = n_features
+        self._chunks = []
+        self._dates = []
+
+    def __len__(self):
+        return sum(c.shape[0] for c in self._chunks)
+
+    @property
+    def shape(self):
+        return len(self), self.n_features or 0
+
+    def append(self, *columns, date=0):
+        """
+        Append a chunk of samples
+
+        :param columns: Either a single (samples, features) array or one 1D array of samples per feature
+        :param date: The acquisition date of the samples as YYYYMMDD integer. Default is 0 (unknown).
+        """
+        if len(columns) == 1 and columns[0].ndim == 2:
+            chunk = columns[0]
+        else:
+            chunk = np.stack(columns, axis=1)
+        if not chunk.shape[0]:
+            return
+        if self.n_features is None:
+            self.n_features = chunk.shape[1]
+        if chunk.shape[1] != self.n_features:
+            raise ValueError("Expected %s features, got %s" % (self.n_features, chunk.shape[1]))
+        self._chunks.append(chunk)
+        self._dates.append((chunk.shape[0], date))
+
+    def to_array(self):
+        """
+        Get all samples as a single array. The chunks are replaced by the result,
+        so that further calls do not copy the samples again.
+
+        :return: The (samples, features) array
+        """
+        if not self._chunks:
+            return np.zeros(self.shape, dtype=np.float32)
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks, axis=0)]
+        return self._chunks[0]
+
+    def dates(self):
+        """
+        Get the acquisition date of each sample
+
+        :return: The (samples,) array of YYYYMMDD integers
+        """
+        return np.repeat(np.array([d for _, d in self._dates], dtype=np.uint32),
+                         [n for n, _ in self._dates])
+
+
+class SamplingPlan(object):
+    """
+    Pixels of a tile from which the training samples are drawn.
+
+    The plan only depends on the water occurrence (GSWO) of the tile, so it is computed once per tile
+    and reused for all acquisitions over it. All indices are flat indices into the tile raster.
+    """
+
+    def __init__(self, gswo, threshold=90, nodata=255):
+        """
+        Create the sampling plan of a tile
+
+        :param gswo: The water occurrence of the tile, on the grid of the acquisitions
+        :param threshold: The occurrence (in %) above which a pixel is considered permanent water. Default is 90.
+        :param nodata: The nodata value of the water occurrence. Default is 255.
+        """
+        self.shape = gswo.shape
+        self.reject = np.flatnonzero(gswo == nodata)
+        self.roi = np.flatnonzero((gswo > threshold) & (gswo != nodata))
+        self.rdn = np.flatnonzero(gswo == 0)
+        self.roi_size = self.roi.size
+
+    @staticmethod
+    def gather(indices, *rasters):
+        """
+        Gather the samples of several rasters at the given pixels
+
+        :param indices: The flat pixel indices
+        :param rasters: The rasters of the tile, one per feature
+        :return: The (samples, features) array
+        """
+        return np.stack([np.take(r, indices) for r in rasters], axis=1)
+
+    def draw_random(self, candidates):
+        """
+        Draw as many random pixels as there are pixels in the ROI
+
+        :param candidates: The flat indices of the valid non-water pixels
+        :return: The flat indices of the drawn pixels
+        """
+        if len(candidates) > self.roi_size:
+            rdn = np.random.choice(len(candidates), size=self.roi_size, replace=False)
+        else:
+            rdn = np.random.choice(len(candidates), size=self.roi_size, replace=True)
+            print("\t\t\tBeware: probably more water than ground in the image")
+        return candidates[rdn]
+
+
+def row_hash(data):
+    """
+    Compute a 64-bit hash of each row of a feature array (FNV-1a over the float32 words of the row)
+
+    :param data: The (samples, features) array
+    :return: The (samples,) array of uint64 hashes
+    """
+    # Rows equal as floats have the same hash: -0.0 is turned into 0.0
+    words = (np.asarray(data, dtype=np.float32) + np.float32(0)).view(np.uint32).astype(np.uint64)
+    h = np.full(words.shape[0], 0xcbf29ce484222325, dtype=np.uint64)
+    prime = np.uint64(0x100000001b3)
+    for j in range(words.shape[1]):
+        h ^= words[:, j]
+        h *= prime
+    return h
+
+
+class RowDeduplicator(object):
+    """
+    Removal of the duplicated samples of several feature arrays, for each label separately.
+
+    Only the 64-bit hashes of the rows are kept while the arrays are added, and the duplicates are found
+    across all of them at once by sorting the hashes instead of the rows.
+    """
+
+    def __init__(self):
+        self._hashes = []
+        self._labels = []
+
+    def add(self, data, label, rows=None):
+        """
+        Register the samples of an array. The rows are read and hashed chunk by chunk,
+        so that a memory-mapped array is never read at once.
+
+        :param data: The (samples, features) array
+        :param label: The label of all samples of the array
+        :param rows: Optional indices of the rows to register. Default is all rows.
+        :return: The index of the array, see :func:`masks`
+        """
+        if rows is None:
+            rows = np.arange(data.shape[0])
+        hashes = np.empty(len(rows), dtype=np.uint64)
+        for start in range(0, len(rows), CHUNK_ROWS):
+            hashes[start:start + CHUNK_ROWS] = row_hash(data[rows[start:start + CHUNK_ROWS]])
+        self._hashes.append(hashes)
+        self._labels.append(label)
+        return len(self._hashes) - 1
+
+    def masks(self):
+        """
+        Get the samples to keep in each added array: The first occurrence of each row of a label.
+
+        :return: The list of boolean masks, one per added array, in the order of addition
+        """
+        masks = [None] * len(self._hashes)
+        for label in set(self._labels):
+            blocks = [i for i, lab in enumerate(self._labels) if lab == label]
+            hashes = np.concatenate([self._hashes[i] for i in blocks])
+            _, first = np.unique(hashes, return_index=True)
+            keep = np.zeros(hashes.shape[0], dtype=bool)
+            keep[first] = True
+            start = 0
+            for i in blocks:
+                masks[i] = keep[start:start + self._hashes[i].shape[0]]
+                start += self._hashes[i].shape[0]
+        return masks
+
+
+def stratum_quotas(sizes, budget):
+    """
+    Share a sample budget equally between strata. The part of the share a small stratum cannot use
+    goes to the larger ones.
+
+    :param sizes: Dict of the number of samples of each stratum
+    :param budget: The total number of samples to draw
+    :return: Dict of the number of samples to draw from each stratum
+    """
+    quotas = {}
+    left = budget
+    ordered = sorted(sizes, key=lambda k: sizes[k])
+    for i, key in enumerate(ordered):
+        quotas[key] = int(min(sizes[key], left // (len(ordered) - i)))
+        left -= quotas[key]
+    return quotas
+
+
+def reservoir_sample(block_sizes, k, rng=None):
+    """
+    Draw k samples uniformly without replacement from a stream of blocks, using random keys:
+    The k samples with the smallest keys are kept while the blocks are visited one after the other.
+
+    :param block_sizes: The number of samples of each block
+    :param k: The number of samples to draw
+    :param rng: Optional :class:`numpy.random.Generator`
+    :return: The sorted indices of the drawn samples in each block
+    """
+    rng = rng or np.random.default_rng()
+    keys = np.empty(0, dtype=np.float64)
+    blocks = np.empty(0, dtype=np.int64)
+    rows = np.empty(0, dtype=np.int64)
+    for b, n in enumerate(block_sizes):
+        keys = np.concatenate((keys, rng.random(n)))
+        blocks = np.concatenate((blocks, np.full(n, b, dtype=np.int64)))
+        rows = np.concatenate((rows, np.arange(n, dtype=np.int64)))
+        if keys.size > k:
+            keep = np.argpartition(keys, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.int64)
+            keys, blocks, rows = keys[keep], blocks[keep], rows[keep]
+    return [np.sort(rows[blocks == b]) for b in range(len(block_sizes))]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+
+Streaming inference: Features are built and predicted one raster window at a time,
+so that the memory used does not depend on the scene size.
+"""
+
+
+import os
+import numpy as np
+from osgeo import gdal
+from Common import PredictionEngine
+from Common.GDalDatasetWrapper import GDalDatasetWrapper
+
+
+def open_warped(src, **options):
+    """
+    Open a dataset warped on the fly (VRT), so that windows can be read without warping the full raster first.
+
+    :param src: The input filename or dataset
+    :param options: Optional gdalwarp keyword arguments, e.g. tr="10 10", r="cubic"
+    :return: The warped VRT dataset
+    :rtype: :class:`gdal.Dataset`
+    """
+    options_list = ["-of", "VRT"]
+    for k, v in options.items():
+        if type(v) is not bool:
+            options_list += ["-%s" % k, "%s" % v]
+        elif v is True:
+            options_list.append("-%s" % k)
+    wrapper = src
+    if type(src) == GDalDatasetWrapper:
+        src = src.get_ds()
+    vrt = gdal.Warp("", src, options=" ".join(options_list))
+    # The VRT reads the source on each access: The in-memory source lives at least as long as the VRT
+    vrt._sources = [wrapper, src]
+    return vrt
+
+
+def raster_size(src):
+    """
+    Get the size of a window source
+
+    :param src: A :class:`gdal.Dataset`, :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper` or 2D numpy array
+    :return: The (xsize, ysize) of the source
+    """
+    if isinstance(src, gdal.Dataset):
+        return src.RasterXSize, src.RasterYSize
+    if type(src) == GDalDatasetWrapper:
+        return src.size
+    return src.shape[1], src.shape[0]
+
+
+def read_window(src, xoff, yoff, xsize, ysize):
+    """
+    Read a window of a source
+
+    :param src: A :class:`gdal.Dataset`, :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper` or 2D numpy array
+    :param xoff: The column offset of the window
+    :param yoff: The line offset of the window
+    :param xsize: The number of columns of the window
+    :param ysize: The number of lines of the window
+    :return: The 2D array of the window
+    """
+    if isinstance(src, gdal.Dataset):
+        return src.GetRasterBand(1).ReadAsArray(xoff, yoff, xsize, ysize)
+    if type(src) == GDalDatasetWrapper:
+        return src.read_window(xoff, yoff, xsize, ysize)
+    return src[yoff:yoff + ysize, xoff:xoff + xsize]
+
+
+def iter_windows(xsize, ysize, lines, block_lines=1):
+    """
+    Iterate over full-width strips of a raster
+
+    :param xsize: The number of columns of the raster
+    :param ysize: The number of lines of the raster
+    :param lines: The maximum number of lines per window
+    :param block_lines: The window height is rounded down to a multiple of this (e.g. the GDAL block height)
+    :return: Generator of (xoff, yoff, xsize, ysize) windows
+    """
+    if lines > block_lines:
+        lines -= lines % block_lines
+    lines = max(1, min(lines, ysize))
+    for yoff in range(0, ysize, lines):
+        yield 0, yoff, xsize, min(lines, ysize - yoff)
+
+
+def stream_predict(model, sources, feature_fn, out, memory_budget=PredictionEngine.DEFAULT_MEMORY_BUDGET,
+                   n_workers=None, unique=False, backend="thread", model_path=None, window_fn=None):
+    """
+    Read, build the features, predict and write the classes window by window.
+
+    :param model: The trained model
+    :param sources: The list of window sources, all of the same size. Each can be a :class:`gdal.Dataset`,
+    a :class:`Common.GDalDatasetWrapper.GDalDatasetWrapper` or a 2D numpy array
+    :param feature_fn: Function building the (n_pixels, n_features) stack from the windows read from each source
+    :param out: The output. Either a (ysize, xsize) numpy array or a :class:`gdal.Band`
+    :param memory_budget: Memory budget in bytes for the features of a window
+    :param n_workers: The number of workers predicting each window. Default is the number of CPUs.
+    :param unique: Predict only the distinct feature tuples of each window, see
+    :func:`Common.PredictionEngine.predict_unique`. Default is False.
+    :param backend: One of 'thread' or 'process', see :func:`Common.PredictionEngine.predict_blocks`
+    :param model_path: The path to the model file, needed by the 'process' backend
+    :param window_fn: Optional function (classes, xoff, yoff) modifying the classes of each window in place
+    before they are written, e.g. to set the nodata and cloud pixels
+    :return: The output
+    """
+    xsize, ysize = raster_size(sources[0])
+    for src in sources[1:]:
+        if raster_size(src) != (xsize, ysize):
+            raise ValueError("All sources need to be of the same size: %s != %s" % (raster_size(src),
+                                                                                    (xsize, ysize)))
+    n_workers = n_workers or os.cpu_count() or 1
+    n_features = feature_fn(*[np.zeros((1, 1), dtype=np.float32) for _ in sources]).shape[1]
+    lines = PredictionEngine.block_rows(n_features, memory_budget, itemsize=8) // xsize
+    block_lines = 1
+    if isinstance(sources[0], gdal.Dataset):
+        block_lines = sources[0].GetRasterBand(1).GetBlockSize()[1]
+
+    windows = list(iter_windows(xsize, ysize, lines, block_lines))
+    print("\tStreaming inference over %s windows of %s lines" % (len(windows), windows[0][-1]))
+    # A single pool for all windows: the workers of the process backend load the model once
+    executor = PredictionEngine.create_executor(model, n_workers, backend, model_path)
+    predict = PredictionEngine.predict_unique if unique else PredictionEngine.predict_blocks
+    with executor:
+        for xoff, yoff, win_xsize, win_ysize in windows:
+            arrays = [read_window(src, xoff, yoff, win_xsize, win_ysize) for src in sources]
+            features = feature_fn(*arrays)
+            del arrays
+            pred = np.empty((win_ysize, win_xsize), dtype=np.uint8)
+            predict(model, features, out=pred, memory_budget=memory_budget, n_workers=n_workers, backend=backend,
+                    verbose=False, executor=executor)
+            if window_fn is not None:
+                window_fn(pred, xoff, yoff)
+            if isinstance(out, np.ndarray):
+                out[yoff:yoff + win_ysize, xoff:xoff + win_xsize] = pred
+            else:
+                out.WriteArray(pred, xoff, yoff)
+    return out
@@ -1,177 +1,251 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Copyright (C) CNES - All Rights Reserved
-This file is subject to the terms and conditions defined in
-file 'LICENSE.md', which is part of this source code package.
-
-Project:        FloodML, CNES
-"""
-
-
-
-import os
-import glob
-import numpy as np
-import argparse
-import tempfile
-from Common import RDF_tools
-from Common import FileSystem
-from Common.GDalDatasetWrapper import GDalDatasetWrapper
-from Common.ImageTools import gdal_warp
-from Common.ImageIO import transform_point
-from Common.Mosaicist import get_copdem_codes
-
-
-def main_preparation(args):
-    emsr_dir = args.input
-    gsw_dir = args.gsw
-    db_dirout = args.output
-    merit_dir = args.meritdir
-    copdem_dir = args.copdemdir
-    sat = args.sentinel
-    emsr_numbers = args.emsr_numbers
-    tag = args.suffix
-
-    # EMSR directories listing
-    emsr_list = glob.glob(os.path.join(emsr_dir, "EMSR*"), recursive=False)
-
-    # Select DEM based on provided paths
-    dem_choice = "copernicus" if copdem_dir else "merit"
-
-    # Create Temporary file-directory
-    tmp_dir = tempfile.mkdtemp(dir=os.getcwd())
-
-    os.environ["PATH"] = os.environ["PATH"].split(";")[-1]
-    print(emsr_list)
-
-    # EMSR parsing
-    for emsr_id in emsr_numbers:
-
-        # EMSR directories listing
-        emsr_path = sorted(glob.glob(os.path.join(emsr_dir, "EMSR" + str(emsr_id)), recursive=False))
-
-        if not emsr_path:
-            print("Skipping EMSR %s. Cannot find folder." % emsr_id)
-            continue
-        emsr_path = emsr_path[0]
-
-        vstack = np.array([], dtype=np.float32)
-        rdn = np.array([], dtype=np.float32)
-
-        print("\nEMSR considered: ", emsr_path)
-
-        tiles = [f for f in os.listdir(emsr_path) if len(f) == 5]
-        print("tiles : ", tiles)
-
-        # Tile parsing in each EMSR case
-        for tile in tiles:
-
-            print("\n\t Tile: ", tile)
-
-            if sat == 1:
-                file_list = glob.glob(os.path.join(emsr_path, tile) + "/s*.tif",
-                                      recursive=True)
-            elif sat == 2:
-                file_list = glob.glob(os.path.join(emsr_path, tile) + "/S2*/GRANULE/*/IMG_DATA/*/*B03*10m.jp2",
-                                      recursive=True)
-            else:
-                raise ValueError("Unknown Sentinel Satellite. Has to be 1 or 2.")
-            # Tile info (epsg and extent)
-            ds_in = GDalDatasetWrapper.from_file(file_list[0])
-            epsg = str(ds_in.epsg)
-            extent_str = ds_in.extent(dtype=str)
-
-            # Mask formation from GSWO
-            gswo_name = os.path.join(gsw_dir, "%s.tif" % tile)
-
-            print("\t\t GSWO_file:  ", gswo_name)
-            ds_out = gdal_warp(gswo_name, tr="%s %s" % (ds_in.resolution[0], ds_in.resolution[1]),
-                               s_srs="EPSG:4326",
-                               t_srs="EPSG:%s" % epsg,
-                               te=ds_in.extent(dtype=str),
-                               r="cubic", ot="Int16")
-            dim = ds_out.array.shape[:2]
-            gswo = ds_out.array
-            idx_reject_gswo = np.where(gswo == 255)  # index to reject
-            mask_gswo = np.zeros(shape=(dim[1], dim[0]))
-            mask_gswo[np.where((gswo > 90) & (gswo != 255))] = 1  # Threshold put to 90%
-
-            imask_rdn = np.ravel(np.flatnonzero(gswo == 0))
-
-            # Parsing for each file of each tile of each EMSR case
-            if sat == 1:  # Sentinel-1 case
-                # MERIT or Copernicus-DEM topography files for corresponding tile (S1 case)
-                if dem_choice == "copernicus":
-                    ul_latlon = transform_point(ds_in.ul_lr[:2], old_epsg=ds_in.epsg, new_epsg=4326)
-                    lr_latlon = transform_point(ds_in.ul_lr[-2:], old_epsg=ds_in.epsg, new_epsg=4326)
-                    topo_names = get_copdem_codes(copdem_dir, ul_latlon, lr_latlon)
-                else:
-                    topo_names = [os.path.join(merit_dir, tile + ".tif")]
-
-                print("\t\t DEM files:  ", topo_names)
-                slp_norm, idx_reject_slp = RDF_tools.slope_creator(tmp_dir, epsg, extent_str, topo_names)
-
-                # Water proof areas (where water occurrence >90% and slopes <10°)
-                imask_roi = np.ravel(np.flatnonzero(mask_gswo > 0))
-
-                # S1 related file listing
-                s1_vv = glob.glob(os.path.join(emsr_path, tile, "**/*", "*vv*.tif"), recursive=True)
-                print("\n\t** ", len(s1_vv), "S1 files to consider")
-
-                # S1 parsing and processing (VV & VH)
-                vstack, rdn = RDF_tools.s1_prep_stack_builder(s1_vv, slp_norm, idx_reject_gswo, idx_reject_slp,
-                                                              mask_gswo, imask_roi, imask_rdn, vstack, rdn)
-            elif sat == 2:  # Sentinel-2 case
-
-                imask_roi = np.ravel(np.flatnonzero((mask_gswo > 0)))
-                file_list = glob.glob(os.path.join(emsr_path, tile) + "/S2*", recursive=False)
-
-                # S2 parsing and processing (NDVI & MNDWI)
-                vstack, rdn = RDF_tools.s2_prep_stack_builder(file_list, idx_reject_gswo,
-                                                              mask_gswo, imask_roi, imask_rdn, vstack, rdn)
-
-        # Save outputs for training
-        vstack_out = vstack.transpose()
-        rdn_out = rdn.transpose()
-        vec_ok = np.ravel(np.flatnonzero(np.sum(vstack, axis=0)))
-
-        vstack_out = vstack_out[vec_ok]
-        rdn_out = rdn_out[vec_ok]
-        emsr_id = emsr_path.split("/")[-1]
-
-        FileSystem.create_directory(db_dirout)
-        if tag is None:
-            namo = os.path.join(db_dirout,  "DB_S%s_%s_WAT.npy" % (sat, emsr_id))
-            namo2 = os.path.join(db_dirout, "DB_S%s_%s_RDN.npy" % (sat, emsr_id))
-        else:
-            namo = os.path.join(db_dirout,  "DB_S%s_%s_WAT_%s.npy" % (sat, emsr_id, tag))
-            namo2 = os.path.join(db_dirout,  "DB_S%s_%s_RDN_%s.npy" % (sat, emsr_id, tag))
-
-        np.save(namo, vstack_out, allow_pickle=False)
-        np.save(namo2, rdn_out, allow_pickle=False)
-
-        print("Water stack size: ", vstack_out.shape)
-        print("RDN stack size: ", rdn_out.shape)
-
-    FileSystem.remove_directory(tmp_dir)
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Data preparation scheduler')
-
-    parser.add_argument('-i', '--input', help='Input folder (EMSR folder)', type=str, required=True)
-    parser.add_argument('-g', '--gsw', help='Tiled GSW folder', type=str, required=True)
-    parser.add_argument('--sentinel', help='S1 or S2', type=int, required=True, choices=[1, 2])
-    parser.add_argument('-n', '--emsr_numbers', help='EMSR cases name', nargs='+', type=int)
-    parser.add_argument('-o', '--output', help='Output folder (NPY folder)', type=str, required=True)
-    parser.add_argument('-m', '--meritdir', help='MERIT DEM folder.'
-                                                 'Either this or --copdemdir has to be set for sentinel 1.',
-                        type=str, required=False)
-    parser.add_argument('-c', '--copdemdir', help='Copernicus DEM folder.'
-                                                  'Either this or --meritdir has to be set for sentinel 1.',
-                        type=str, required=False)
-    parser.add_argument('-s', '--suffix', help='Suffix tag', type=str, required=False)
-    arg = parser.parse_args()
-
-    main_preparation(arg)
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+
+import os
+import glob
+import numpy as np
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from Common import RDF_tools
+from Common import FileSystem
+from Common.GDalDatasetWrapper import GDalDatasetWrapper
+from Common.ImageTools import gdal_warp
+from Common.ImageIO import transform_point
+from Common.Mosaicist import get_copdem_codes
+from Common import AuxiliaryLayers
+from Common.TrainingSamples import FeatureBuffer, SamplingPlan
+from Common.FeatureStore import FeatureStore
+
+
+def prepare_tile(emsr_path, tile, args, tmp_dir):
+    """
+    Extract the water and random training samples of all acquisitions over a tile
+
+    :param emsr_path: The EMSR folder
+    :param tile: The tile name
+    :param args: The command line arguments
+    :param tmp_dir: The temporary folder of the tile
+    :return: The water and random samples, each as :class:`Common.TrainingSamples.FeatureBuffer`
+    """
+    sat = args.sentinel
+    # VV, VH and slope for S1, NDVI and MNDWI for S2
+    n_features = 3 if sat == 1 else 2
+    vstack = FeatureBuffer(n_features)
+    rdn = FeatureBuffer(n_features)
+
+    print("\n\t Tile: ", tile)
+
+    if sat == 1:
+        file_list = glob.glob(os.path.join(emsr_path, tile) + "/s*.tif",
+                              recursive=True)
+    elif sat == 2:
+        file_list = glob.glob(os.path.join(emsr_path, tile) + "/S2*/GRANULE/*/IMG_DATA/*/*B03*10m.jp2",
+                              recursive=True)
+    else:
+        raise ValueError("Unknown Sentinel Satellite. Has to be 1 or 2.")
+    # Tile info (epsg and extent)
+    ds_in = GDalDatasetWrapper.from_file(file_list[0])
+    epsg = str(ds_in.epsg)
+    extent_str = ds_in.extent(dtype=str)
+
+    # Mask formation from GSWO
+    gswo_name = os.path.join(args.gsw, "%s.tif" % tile)
+
+    print("\t\t GSWO_file:  ", gswo_name)
+    ds_out = gdal_warp(gswo_name, tr="%s %s" % (ds_in.resolution[0], ds_in.resolution[1]),
+                       s_srs="EPSG:4326",
+                       t_srs="EPSG:%s" % epsg,
+                       te=ds_in.extent(dtype=str),
+                       r="cubic", ot="Int16")
+    # Water proof areas (water occurrence >90%) and random non-water pixels, shared by all acquisitions
+    plan = SamplingPlan(ds_out.array)
+
+    # Parsing for each file of each tile of each EMSR case
+    if sat == 1:  # Sentinel-1 case
+        # MERIT or Copernicus-DEM topography files for corresponding tile (S1 case)
+        if args.copdemdir:
+            ul_latlon = transform_point(ds_in.ul_lr[:2], old_epsg=ds_in.epsg, new_epsg=4326)
+            lr_latlon = transform_point(ds_in.ul_lr[-2:], old_epsg=ds_in.epsg, new_epsg=4326)
+            topo_names = get_copdem_codes(args.copdemdir, ul_latlon, lr_latlon)
+        else:
+            topo_names = [os.path.join(args.meritdir, tile + ".tif")]
+
+        print("\t\t DEM files:  ", topo_names)
+        slp_norm, idx_reject_slp = RDF_tools.slope_creator(tmp_dir, epsg, extent_str, topo_names)
+
+        # S1 related file listing
+        s1_vv = glob.glob(os.path.join(emsr_path, tile, "**/*", "*vv*.tif"), recursive=True)
+        print("\n\t** ", len(s1_vv), "S1 files to consider")
+
+        # S1 parsing and processing (VV & VH)
+        vstack, rdn = RDF_tools.s1_prep_stack_builder(s1_vv, slp_norm, idx_reject_slp, plan, vstack, rdn)
+    elif sat == 2:  # Sentinel-2 case
+        file_list = glob.glob(os.path.join(emsr_path, tile) + "/S2*", recursive=False)
+
+        # S2 parsing and processing (NDVI & MNDWI)
+        vstack, rdn = RDF_tools.s2_prep_stack_builder(file_list, plan, vstack, rdn)
+
+    return vstack, rdn
+
+
+def _init_worker(aux_cache, aux_cache_size, aux_memory):
+    """
+    Set up the auxiliary layer service of a worker process
+
+    :param aux_cache: The directory of the auxiliary layer cache
+    :param aux_cache_size: The maximum size of the auxiliary layer cache in MB
+    :param aux_memory: The maximum size of the in-memory auxiliary layer cache of the worker in MB
+    """
+    AuxiliaryLayers.set_default(AuxiliaryLayers.AuxiliaryLayers(cache_dir=aux_cache,
+                                                                max_bytes=aux_cache_size * 1024 ** 2,
+                                                                max_memory_bytes=aux_memory * 1024 ** 2))
+
+
+def tile_shard(store, emsr_path, tile, vstack, rdn):
+    """
+    Write the training samples of a tile as a shard of the feature store
+
+    :param store: The :class:`Common.FeatureStore.FeatureStore`
+    :param emsr_path: The EMSR folder
+    :param tile: The tile name
+    :param vstack: The water samples as :class:`Common.TrainingSamples.FeatureBuffer`
+    :param rdn: The random samples as :class:`Common.TrainingSamples.FeatureBuffer`
+    :return: The manifest entry of the shard. None if the tile has no samples.
+    """
+    vstack_out = vstack.to_array()
+    rdn_out = rdn.to_array()
+    # Samples with all features at 0 are discarded, for both the water and the paired random samples
+    vec_ok = np.ravel(np.flatnonzero(np.sum(vstack_out, axis=1)))
+    if not vec_ok.size:
+        print("\t\tNo water samples in tile %s" % tile)
+        return None
+    rdn_ok = vec_ok[vec_ok < rdn_out.shape[0]]
+
+    features = np.concatenate((vstack_out[vec_ok], rdn_out[rdn_ok]), axis=0)
+    labels = np.concatenate((np.ones(len(vec_ok), dtype=np.uint8), np.zeros(len(rdn_ok), dtype=np.uint8)))
+    dates = np.concatenate((vstack.dates()[vec_ok], rdn.dates()[rdn_ok]))
+    print("\t\tWater / RDN samples of tile %s: %s / %s" % (tile, len(vec_ok), len(rdn_ok)))
+    return store.write_shard(features, labels, os.path.basename(emsr_path), tile, dates=dates)
+
+
+def prepare_tile_shard(emsr_path, tile, args, tmp_root, store_path):
+    """
+    Extract the training samples of a tile in its own temporary folder and write them as a shard.
+    See :func:`prepare_tile` and :func:`tile_shard`.
+
+    :param emsr_path: The EMSR folder
+    :param tile: The tile name
+    :param args: The command line arguments
+    :param tmp_root: The folder in which the temporary folder of the tile is created
+    :param store_path: The folder of the feature store
+    :return: The manifest entry of the shard. None if the tile has no samples.
+    """
+    tmp_dir = tempfile.mkdtemp(dir=tmp_root)
+    try:
+        vstack, rdn = prepare_tile(emsr_path, tile, args, tmp_dir)
+    finally:
+        FileSystem.remove_directory(tmp_dir)
+    return tile_shard(FeatureStore(store_path, dtype=args.dtype), emsr_path, tile, vstack, rdn)
+
+
+def main_preparation(args):
+    emsr_dir = args.input
+    emsr_numbers = args.emsr_numbers
+    # Auxiliary layers (slope, GSW, WorldCover) cached in memory and, optionally, on disk
+    _init_worker(args.aux_cache, args.aux_cache_size, args.aux_memory)
+
+    # EMSR directories listing
+    emsr_list = glob.glob(os.path.join(emsr_dir, "EMSR*"), recursive=False)
+
+    # Create Temporary file-directory
+    tmp_dir = tempfile.mkdtemp(dir=os.getcwd())
+
+    os.environ["PATH"] = os.environ["PATH"].split(";")[-1]
+    print(emsr_list)
+
+    # EMSR parsing
+    jobs = []
+    for emsr_id in emsr_numbers:
+
+        # EMSR directories listing
+        emsr_path = sorted(glob.glob(os.path.join(emsr_dir, "EMSR" + str(emsr_id)), recursive=False))
+
+        if not emsr_path:
+            print("Skipping EMSR %s. Cannot find folder." % emsr_id)
+            continue
+        emsr_path = emsr_path[0]
+        tiles = [f for f in os.listdir(emsr_path) if len(f) == 5]
+        print("EMSR considered: %s, tiles: %s" % (emsr_path, tiles))
+        jobs += [(emsr_path, tile) for tile in tiles]
+
+    # Training database, one shard per tile. Previous shards of the EMSR cases are replaced
+    # once all new shards are written, so that an interrupted run keeps them.
+    if args.suffix is None:
+        store_path = os.path.join(args.output, "DB_S%s" % args.sentinel)
+    else:
+        store_path = os.path.join(args.output, "DB_S%s_%s" % (args.sentinel, args.suffix))
+    store = FeatureStore(store_path, dtype=args.dtype)
+
+    if args.workers > 1:
+        # Tiles of all EMSR cases processed in parallel, each worker writing its own shards
+        print("Processing %s tiles using %s workers" % (len(jobs), args.workers))
+        # The in-memory auxiliary layer cache is shared out among the workers
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=(args.aux_cache, args.aux_cache_size,
+                                           args.aux_memory // args.workers)) as executor:
+            futures = [executor.submit(prepare_tile_shard, emsr_path, tile, args, tmp_dir, store_path)
+                       for emsr_path, tile in jobs]
+            entries = [future.result() for future in futures]
+    else:
+        entries = []
+        # Tile parsing in each EMSR case
+        for emsr_path, tile in jobs:
+            vstack, rdn = prepare_tile(emsr_path, tile, args, tmp_dir)
+            entries.append(tile_shard(store, emsr_path, tile, vstack, rdn))
+
+    store.add([e for e in entries if e is not None],
+              replace=sorted(set(os.path.basename(emsr_path) for emsr_path, _ in jobs)))
+    print("Training database %s: %s samples in %s shards" % (store_path, len(store), len(store.shards)))
+
+    FileSystem.remove_directory(tmp_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Data preparation scheduler')
+
+    parser.add_argument('-i', '--input', help='Input folder (EMSR folder)', type=str, required=True)
+    parser.add_argument('-g', '--gsw', help='Tiled GSW folder', type=str, required=True)
+    parser.add_argument('--sentinel', help='S1 or S2', type=int, required=True, choices=[1, 2])
+    parser.add_argument('-n', '--emsr_numbers', help='EMSR cases name', nargs='+', type=int)
+    parser.add_argument('-o', '--output', help='Output folder (training database folder)', type=str, required=True)
+    parser.add_argument('-m', '--meritdir', help='MERIT DEM folder.'
+                                                 'Either this or --copdemdir has to be set for sentinel 1.',
+                        type=str, required=False)
+    parser.add_argument('-c', '--copdemdir', help='Copernicus DEM folder.'
+                                                  'Either this or --meritdir has to be set for sentinel 1.',
+                        type=str, required=False)
+    parser.add_argument('-s', '--suffix', help='Suffix tag', type=str, required=False)
+    parser.add_argument('--aux_cache', help='Directory caching the auxiliary layers (slope, GSW, WorldCover) '
+                                            'computed for each tile', type=str, required=False)
+    parser.add_argument('--dtype', help='Feature dtype of the training database. Default is the one of the '
+                                        'existing database, else float32.', type=str, required=False,
+                        choices=["float32", "float16"])
+    parser.add_argument('-w', '--workers', help='Number of tiles processed in parallel', type=int,
+                        required=False, default=1)
+    parser.add_argument('--aux_cache_size', help='Maximum size of the auxiliary layer cache in MB', type=int,
+                        required=False, default=10240)
+    parser.add_argument('--aux_memory', help='Maximum size of the in-memory auxiliary layer cache in MB, '
+                                             'shared out among the workers', type=int, required=False, default=2048)
+    arg = parser.parse_args()
+
+    main_preparation(arg)
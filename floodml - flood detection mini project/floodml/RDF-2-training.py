@@ -1,136 +1,227 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Copyright (C) CNES - All Rights Reserved
-This file is subject to the terms and conditions defined in
-file 'LICENSE.md', which is part of this source code package.
-
-Project:        FloodML, CNES
-"""
-
-
-import os
-import gc
-import numpy as np
-import joblib
-import argparse
-from Common.validationTools import calculate_fscore_2
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-
-from Common import FileSystem
-
-
-def main_training(args):
-
-    npy_dir = args.NPY_dir
-    db_output = args.db_output
-    sat = args.sentinel
-    emsr_numbers = list(set(args.EMSR_numbers))  # Only get unique EMSR numbers - Do not train twice on the same
-    intag = args.suffix_in
-    outag = args.suffix_out
-
-    if args.gpu:
-        from cuml import RandomForestClassifier
-    else:
-        from sklearn.ensemble import RandomForestClassifier
-
-    all_gt, all_train = list(), list()
-    for emsr in emsr_numbers:
-
-        emsr = str(emsr)
-        print("EMSR considered:", emsr)
-
-        if intag is None:
-            ground_truth = os.path.join(npy_dir,  "DB_S%s_EMSR%s_WAT.npy" % (sat, emsr))
-            trained = os.path.join(npy_dir, "DB_S%s_EMSR%s_RDN.npy" % (sat, emsr))
-        else:
-            ground_truth = os.path.join(npy_dir,  "DB_S%s_EMSR%s_WAT_%s.npy" % (sat, emsr, intag))
-            trained = os.path.join(npy_dir,  "DB_S%s_EMSR%s_RDN_%s.npy" % (sat, emsr, intag))
-
-        try:
-            data_vt = np.load(ground_truth)
-            data_rdn = np.load(trained)
-        except FileNotFoundError as e:
-            print(e)
-            continue
-
-        # NPY duplicated rows reduction  for WATER#
-        # Perform lex sort and get sorted data
-        sorted_idx = np.lexsort(data_vt.T)
-        sorted_data = data_vt[sorted_idx, :]
-        # Get unique row mask
-        row_mask = np.append([True], np.any(np.diff(sorted_data, axis=0), 1))
-        # Get unique rows
-        data_vt = sorted_data[row_mask]
-
-        # NPY duplicated rows reduction  for RDN
-        # Perform lex sort and get sorted data
-        sorted_idx = np.lexsort(data_rdn.T)
-        sorted_data = data_rdn[sorted_idx, :]
-        # Get unique row mask
-        row_mask = np.append([True], np.any(np.diff(sorted_data, axis=0), 1))
-        # Get unique rows
-        data_rdn = sorted_data[row_mask]
-
-        all_gt.append(data_vt)
-        all_train.append(data_rdn)
-
-    gt_concat = np.concatenate(all_gt, axis=0)
-    train_concat = np.concatenate(all_train, axis=0)
-
-    # Y vector ######################################
-    yvt = np.ones((gt_concat.shape[0], 1), dtype=np.float32)
-    yrdn = np.zeros((train_concat.shape[0], 1), dtype=np.float32)
-
-    # Concat ########################################
-    xb = np.array(np.vstack((gt_concat, train_concat)), dtype=np.float32)
-    yb = np.vstack((yvt, yrdn))
-
-    # Classif ######################################
-    # Split into train and test set
-    x_train, x_test, y_train, y_test = train_test_split(xb, yb, test_size=0.33)
-
-    # Random Forest
-    print("\n###    Random forest training    ###")
-    if args.gpu:
-        parameters = {"n_estimators": 100}
-    else:
-        parameters = {"n_estimators": 100, "n_jobs": -1}
-
-    rdf = RandomForestClassifier(**parameters)
-    rdf.fit(x_train, y_train)
-
-    # Export cuML RF model as Treelite checkpoint for CPU computing
-    checkpoint_path = os.path.join(db_output, "DB_S%s_CPU_%s.sav" % (sat, outag)) 
-    rdf.convert_to_treelite_model().to_treelite_checkpoint(checkpoint_path)
-
-    rdf_pred = rdf.predict(x_test)
-    rdf_score = accuracy_score(rdf_pred, y_test)
-    print("Accuracy: {:.5f}".format(rdf_score))
-    print("FScore:   {:.5f}".format(calculate_fscore_2(rdf_pred, y_test[..., 0])))
-    gc.collect()
-
-    FileSystem.create_directory(db_output)
-    if outag is None:
-        joblib.dump(rdf, os.path.join(db_output, "DB_RDF_global_S%s.sav" % sat))
-    else:  # adds output tag
-        joblib.dump(rdf, os.path.join(db_output, "DB_RDF_global_S%s_%s.sav" % (sat, outag)))
-
-    print("Successfully finished training step.")
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Data preparation scheduler')
-
-    parser.add_argument('-i', '--NPY_dir', help='Input folder (NPY folder)', type=str, required=True)
-    parser.add_argument('-n', '--EMSR_numbers', help='EMSR cases name', nargs='+', type=int, required=True)
-    parser.add_argument('--sentinel', help='S1 or S2', type=int, required=True, choices=[1, 2])
-    parser.add_argument('-o', '--db_output', help='Global DB output folder ', type=str, required=True)
-    parser.add_argument('-si', '--suffix_in', help='Input suffix tag ', type=str, required=False)
-    parser.add_argument('-so', '--suffix_out', help='Output suffix tag ', type=str, required=False)
-    parser.add_argument("--gpu", help="Use GPU for training. Requires cuML to be installed.",
-                        default=False, action="store_true")
-    arg = parser.parse_args()
-
-    main_training(arg)
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+import os
+import sys
+import gc
+import numpy as np
+import joblib
+import argparse
+from Common.validationTools import calculate_fscore_2
+from sklearn.metrics import accuracy_score
+
+from Common import FileSystem
+from Common.FeatureStore import FeatureStore
+from Common.TrainingSamples import RowDeduplicator, stratum_quotas, reservoir_sample, CHUNK_ROWS
+from Common.ModelRegistry import append_lineage
+from Common.FlatForest import FlatForest
+
+
+def legacy_sources(npy_dir, sat, emsr, intag=None):
+    """
+    Get the water and random samples of an EMSR case from the legacy DB_S*_EMSR*_WAT/RDN.npy pair
+
+    :param npy_dir: The NPY folder
+    :param sat: The satellite (1 or 2)
+    :param emsr: The EMSR number
+    :param intag: Optional input suffix tag
+    :return: The list of (emsr, label, memory-mapped features, row indices) sources. Empty if the files do not exist.
+    """
+    if intag is None:
+        ground_truth = os.path.join(npy_dir,  "DB_S%s_EMSR%s_WAT.npy" % (sat, emsr))
+        trained = os.path.join(npy_dir, "DB_S%s_EMSR%s_RDN.npy" % (sat, emsr))
+    else:
+        ground_truth = os.path.join(npy_dir,  "DB_S%s_EMSR%s_WAT_%s.npy" % (sat, emsr, intag))
+        trained = os.path.join(npy_dir,  "DB_S%s_EMSR%s_RDN_%s.npy" % (sat, emsr, intag))
+
+    try:
+        data_vt = np.load(ground_truth, mmap_mode="r")
+        data_rdn = np.load(trained, mmap_mode="r")
+    except FileNotFoundError as e:
+        print(e)
+        return []
+    return [(emsr, 1, data_vt, np.arange(data_vt.shape[0])),
+            (emsr, 0, data_rdn, np.arange(data_rdn.shape[0]))]
+
+
+def store_sources(store, emsr):
+    """
+    Get the water and random samples of an EMSR case from the feature store
+
+    :param store: The :class:`Common.FeatureStore.FeatureStore`
+    :param emsr: The EMSR number
+    :return: The list of (emsr, label, memory-mapped features, row indices) sources.
+    Empty if the store has no shard of the EMSR case.
+    """
+    entries = store.select([emsr])
+    if not entries:
+        print("No samples of EMSR%s in %s" % (emsr, store.path))
+    sources = []
+    for entry in entries:
+        features, labels, _ = store.open(entry)
+        labels = np.asarray(labels)
+        for label in (1, 0):
+            sources.append((emsr, label, features, np.flatnonzero(labels == label)))
+    return sources
+
+
+def main_training(args):
+
+    npy_dir = args.NPY_dir
+    db_output = args.db_output
+    sat = args.sentinel
+    emsr_numbers = list(set(args.EMSR_numbers))  # Only get unique EMSR numbers - Do not train twice on the same
+    intag = args.suffix_in
+    outag = args.suffix_out
+
+    if args.gpu:
+        from cuml import RandomForestClassifier
+    else:
+        from sklearn.ensemble import RandomForestClassifier
+
+    # Sharded training database written by RDF-1, or legacy per-EMSR .npy pairs
+    store_path = os.path.join(npy_dir, "DB_S%s" % sat if intag is None else "DB_S%s_%s" % (sat, intag))
+    store = FeatureStore(store_path) if FeatureStore.exists(store_path) else None
+
+    sources = list()
+    for emsr in emsr_numbers:
+
+        emsr = str(emsr)
+        print("EMSR considered:", emsr)
+
+        if store is not None:
+            sources += store_sources(store, emsr)
+        else:
+            sources += legacy_sources(npy_dir, sat, emsr, intag)
+    if not sources:
+        sys.exit("No training samples found for EMSR %s in %s" % (", ".join(str(e) for e in sorted(emsr_numbers)),
+                                                                 store_path if store is not None else npy_dir))
+    n_features = sources[0][2].shape[1]
+
+    if args.memory_budget:
+        # Stratified sample of each EMSR case and class, so that the training matrix fits in the budget:
+        # Features and label of each row, its shuffled position and its deduplication mask
+        budget = int(args.memory_budget * 1024 ** 2 // (n_features * 4 + 4 + 8 + 1))
+        n_available = sum(len(rows) for _, _, _, rows in sources)
+        strata = dict()
+        for i, (emsr, label, _, rows) in enumerate(sources):
+            strata.setdefault((emsr, label), []).append(i)
+        quotas = stratum_quotas({key: sum(len(sources[i][3]) for i in idx) for key, idx in strata.items()}, budget)
+        for key, idx in strata.items():
+            picks = reservoir_sample([len(sources[i][3]) for i in idx], quotas[key])
+            for i, pick in zip(idx, picks):
+                emsr, label, features, rows = sources[i]
+                sources[i] = (emsr, label, features, rows[pick])
+        print("Samples drawn for a budget of %sMB: %s/%s" % (args.memory_budget, sum(quotas.values()),
+                                                             n_available))
+
+    # Duplicated rows reduction for WATER and RDN, across all EMSR cases. Only the row hashes are kept.
+    dedup = RowDeduplicator()
+    for emsr, label, features, rows in sources:
+        dedup.add(features, label, rows=rows)
+    masks = dedup.masks()
+    del dedup
+    n_samples = sum(np.count_nonzero(m) for m in masks)
+    n_total = sum(len(m) for m in masks)
+    print("Duplicated rows removed: %s/%s" % (n_total - n_samples, n_total))
+
+    # X and Y, filled in place in a random order: The first rows are the train set, the others the test set.
+    # The kept rows are copied chunk by chunk from the memory-mapped sources.
+    order = np.random.permutation(n_samples)
+    xb = np.empty((n_samples, n_features), dtype=np.float32)
+    yb = np.empty((n_samples, 1), dtype=np.float32)
+    start = 0
+    for (emsr, label, features, rows), mask in zip(sources, masks):
+        kept = rows[mask]
+        for chunk in range(0, len(kept), CHUNK_ROWS):
+            selected = kept[chunk:chunk + CHUNK_ROWS]
+            xb[order[start:start + len(selected)]] = features[selected]
+            start += len(selected)
+        yb[order[start - len(kept):start]] = label
+    del sources, masks
+
+    # Classif ######################################
+    # Split into train and test set
+    n_train = n_samples - int(np.ceil(0.33 * n_samples))
+    x_train, x_test, y_train, y_test = xb[:n_train], xb[n_train:], yb[:n_train], yb[n_train:]
+
+    # Random Forest
+    if args.update:
+        # Incremental training: Additional trees are grown on the given EMSR cases only
+        if args.gpu:
+            raise ValueError("Incremental training is not supported on GPU.")
+        print("\n###    Random forest update of %s (+%s trees)   ###" % (args.update, args.add_trees))
+        rdf = joblib.load(args.update)
+        rdf.set_params(warm_start=True, n_estimators=rdf.n_estimators + args.add_trees, n_jobs=-1)
+    else:
+        print("\n###    Random forest training    ###")
+        if args.gpu:
+            parameters = {"n_estimators": 100}
+        else:
+            parameters = {"n_estimators": 100, "n_jobs": -1}
+        rdf = RandomForestClassifier(**parameters)
+    rdf.fit(x_train, y_train)
+
+    if args.gpu:
+        # Export cuML RF model as Treelite checkpoint for CPU computing
+        checkpoint_path = os.path.join(db_output, "DB_S%s_CPU_%s.sav" % (sat, outag))
+        rdf.convert_to_treelite_model().to_treelite_checkpoint(checkpoint_path)
+
+    rdf_pred = rdf.predict(x_test)
+    rdf_score = accuracy_score(rdf_pred, y_test)
+    print("Accuracy: {:.5f}".format(rdf_score))
+    print("FScore:   {:.5f}".format(calculate_fscore_2(rdf_pred, y_test[..., 0])))
+    gc.collect()
+
+    FileSystem.create_directory(db_output)
+    if outag is None:
+        model_path = os.path.join(db_output, "DB_RDF_global_S%s.sav" % sat)
+    else:  # adds output tag
+        model_path = os.path.join(db_output, "DB_RDF_global_S%s_%s.sav" % (sat, outag))
+    if args.update:
+        rdf.set_params(warm_start=False)
+    joblib.dump(rdf, model_path)
+    if not args.gpu:
+        # Flattened trees for inference without sklearn, see Common.FlatForest
+        flat_path = os.path.splitext(model_path)[0] + ".npz"
+        FlatForest.from_sklearn(rdf).save(flat_path)
+        print("Flattened model written to %s" % flat_path)
+    append_lineage(model_path, base_path=args.update,
+                   emsr=sorted(emsr_numbers),
+                   n_estimators=int(rdf.n_estimators),
+                   n_samples=int(x_train.shape[0]),
+                   accuracy=float(rdf_score))
+
+    print("Successfully finished training step.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Data preparation scheduler')
+
+    parser.add_argument('-i', '--NPY_dir', help='Input folder (training database or NPY folder)', type=str,
+                        required=True)
+    parser.add_argument('-n', '--EMSR_numbers', help='EMSR cases name', nargs='+', type=int, required=True)
+    parser.add_argument('--sentinel', help='S1 or S2', type=int, required=True, choices=[1, 2])
+    parser.add_argument('-o', '--db_output', help='Global DB output folder ', type=str, required=True)
+    parser.add_argument('-si', '--suffix_in', help='Input suffix tag ', type=str, required=False)
+    parser.add_argument('-so', '--suffix_out', help='Output suffix tag ', type=str, required=False)
+    parser.add_argument('-u', '--update', help='Existing model (.sav) to which trees trained on the given EMSR cases '
+                                               'are added, instead of training a new model', type=str, required=False)
+    parser.add_argument('--add_trees', help='Number of trees added when updating a model', type=int,
+                        required=False, default=20)
+    parser.add_argument('--memory_budget', help='Maximum size of the training matrix in MB. '
+                        'A stratified sample of each EMSR case and class is drawn to fit it.', type=int,
+                        required=False)
+    parser.add_argument("--gpu", help="Use GPU for training. Requires cuML to be installed.",
+                        default=False, action="store_true")
+    arg = parser.parse_args()
+
+    main_training(arg)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+import gc
+import unittest
+import numpy as np
+from osgeo import osr
+from Common.GDalDatasetWrapper import GDalDatasetWrapper
+from Common import ImageTools
+from Common.WindowedInference import open_warped
+
+
+def utm_wkt():
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(32631)
+    return srs.ExportToWkt()
+
+
+class TestGDalDatasetWrapper(unittest.TestCase):
+
+    def setUp(self):
+        self.geotransform = (300000.0, 10.0, 0, 4900020.0, 0, -10.0)
+        self.expected = [np.arange(400, dtype=np.float32).reshape(20, 20) + 1000 * i for i in range(2)]
+
+    def _wrappers(self):
+        return [GDalDatasetWrapper(array=e.copy(), projection=utm_wkt(), geotransform=self.geotransform)
+                for e in self.expected]
+
+    @staticmethod
+    def _overwrite_freed_memory():
+        gc.collect()
+        return [np.full((20, 20), -1, dtype=np.float32) for _ in range(1000)]
+
+    def test_get_ds_shares_array(self):
+        ds = self._wrappers()[0]
+        mem = ds.get_ds()
+        ds.array[0, 0] = -5
+        self.assertEqual(mem.GetRasterBand(1).ReadAsArray()[0, 0], -5)
+
+    def test_buildvrt_outlives_inputs(self):
+        # Temporary inputs, only referenced by the VRT
+        vrt = ImageTools.gdal_buildvrt(*self._wrappers(), separate=True)
+        junk = self._overwrite_freed_memory()
+        for i, expected in enumerate(self.expected):
+            np.testing.assert_array_equal(vrt.array[i], expected)
+        del junk
+
+    def test_open_warped_outlives_input(self):
+        vrt = open_warped(self._wrappers()[0], tr="10 10", r="near")
+        junk = self._overwrite_freed_memory()
+        np.testing.assert_array_equal(vrt.GetRasterBand(1).ReadAsArray(), self.expected[0])
+        del junk
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) CNES - All Rights Reserved
+This file is subject to the terms and conditions defined in
+file 'LICENSE.md', which is part of this source code package.
+
+Project:        FloodML, CNES
+"""
+
+
+import threading
+import unittest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from Common import PredictionEngine
+
+
+class ThresholdModel(object):
+    """
+    Model predicting whether the first feature is positive
+    """
+    n_jobs = 1
+
+    def predict(self, x):
+        return (x[:, 0] > 0).astype(np.uint8)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """
+    Thread pool recording the largest number of rows submitted and not predicted yet
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CountingExecutor, self).__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.rows = 0
+        self.max_rows = 0
+
+    def submit(self, fn, model, block):
+        with self.lock:
+            self.rows += block.shape[0]
+            self.max_rows = max(self.max_rows, self.rows)
+        future = super(CountingExecutor, self).submit(fn, model, block)
+        future.add_done_callback(lambda _: self._done(block.shape[0]))
+        return future
+
+    def _done(self, rows):
+        with self.lock:
+            self.rows -= rows
+
+
+class TestPredictionEngine(unittest.TestCase):
+
+    def test_predict_blocks(self):
+        features = np.random.normal(size=(100000, 3))
+        out = PredictionEngine.predict_blocks(ThresholdModel(), features, memory_budget=1024 ** 2, n_workers=3,
+                                              verbose=False)
+        np.testing.assert_array_equal(out, features[:, 0] > 0)
+
+    def test_blocks_in_flight_within_budget(self):
+        n_workers = 4
+        memory_budget = 16 * 1024 ** 2
+        features = np.random.normal(size=(2000000, 3))
+        executor = CountingExecutor(max_workers=n_workers)
+        with executor:
+            PredictionEngine.predict_blocks(ThresholdModel(), features, memory_budget=memory_budget,
+                                            n_workers=n_workers, verbose=False, executor=executor)
+        rows = PredictionEngine.block_rows(3, memory_budget, PredictionEngine.in_flight(n_workers))
+        # Several blocks in flight, and all of them inside the budget
+        self.assertGreater(executor.max_rows, rows)
+        self.assertLessEqual(executor.max_rows * PredictionEngine.row_bytes(3, features.itemsize), memory_budget)
+
+
+if __name__ == '__main__':
+    unittest.main()